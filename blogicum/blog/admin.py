@@ -1,14 +1,28 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Location, Post
+from .models import (
+    AuthorStats,
+    Category,
+    CategoryStats,
+    Comment,
+    Location,
+    LocationStats,
+    Post,
+)
 
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     empty_value_display = "Не задано"
-    list_display = ("title", "location", "is_published")
+    list_display = (
+        "title",
+        "location",
+        "is_published",
+        "is_live",
+        "comment_count",
+    )
     list_editable = ("is_published",)
-    list_filter = ("category", "location")
+    list_filter = ("category", "location", "is_live")
 
 
 @admin.register(Location)
@@ -27,3 +41,42 @@ class CategoryAdmin(admin.ModelAdmin):
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = ("text", "created_at", "author", "post")
+
+
+class ActivityStatsAdmin(admin.ModelAdmin):
+    """Сводки только для просмотра: их ведут сигналы и rebuild_stats."""
+
+    list_display = (
+        "__str__",
+        "posts_published",
+        "comments_received",
+        "last_activity",
+    )
+    ordering = ("-posts_published",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(ActivityStatsAdmin):
+    list_select_related = ("author",)
+    search_fields = ("author__username",)
+
+
+@admin.register(CategoryStats)
+class CategoryStatsAdmin(ActivityStatsAdmin):
+    list_select_related = ("category",)
+    search_fields = ("category__title",)
+
+
+@admin.register(LocationStats)
+class LocationStatsAdmin(ActivityStatsAdmin):
+    list_select_related = ("location",)
+    search_fields = ("location__name",)
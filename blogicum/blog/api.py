@@ -0,0 +1,193 @@
+"""JSON API блога только для чтения.
+
+Ответ сериализуется один раз и кэшируется вместе со строгим ETag
+(хэшем тела) под теми же тегами, что и HTML-страницы. Повторный
+запрос с If-None-Match получает 304 без обращения к базе.
+"""
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views import View
+
+from blog.cache import (
+    FEEDS_TAG,
+    INDEX_TAG,
+    author_tag,
+    category_tag,
+    get_cached_response,
+    post_row_tags,
+    set_cached_response,
+)
+from blog.constants import NUM_PUB_PAGE, RESPONSE_CACHE_TIMEOUT
+from blog.lookups import published_category
+from blog.models import Comment, User
+from blog.paginators import CursorPaginator, InvalidCursor, comments_page
+from blog.secondary_func import querying_posts
+
+POST_FIELDS = (
+    "id",
+    "title",
+    "text",
+    "pub_date",
+    "comment_count",
+    "author_id",
+    "category_id",
+    "location_id",
+    "author__username",
+    "category__slug",
+    "location__name",
+)
+COMMENT_FIELDS = ("id", "text", "created_at", "author__username")
+
+
+def serialize_post(row):
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "text": row["text"],
+        "pub_date": row["pub_date"],
+        "author": row["author__username"],
+        "category": row["category__slug"],
+        "location": row["location__name"],
+        "comment_count": row["comment_count"],
+    }
+
+
+def serialize_comment(row):
+    return {
+        "id": row["id"],
+        "text": row["text"],
+        "created_at": row["created_at"],
+        "author": row["author__username"],
+    }
+
+
+class ApiView(View):
+    """Базовое представление API: кэш, ETag и условный GET.
+
+    get_data() возвращает данные ответа и теги, при сбросе которых ответ
+    устаревает. По умолчанию это одна строка queryset с полями fields,
+    найденная по ключу из URL (pk_url_kwarg).
+    """
+
+    http_method_names = ["get", "head", "options"]
+    cache_timeout = RESPONSE_CACHE_TIMEOUT
+    queryset = None
+    fields = ()
+    pk_url_kwarg = "pk"
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get_object(self):
+        return get_object_or_404(
+            self.get_queryset().values(*self.fields),
+            pk=self.kwargs[self.pk_url_kwarg],
+        )
+
+    def serialize(self, row):
+        return row
+
+    def get_tags(self, row):
+        return ()
+
+    def get_data(self):
+        row = self.get_object()
+        return self.serialize(row), self.get_tags(row)
+
+    def get(self, request, *args, **kwargs):
+        # Ответ не зависит от пользователя, поэтому кэшируется для всех.
+        entry = get_cached_response(request)
+        if entry is None:
+            data, tags = self.get_data()
+            body = json.dumps(
+                data,
+                cls=DjangoJSONEncoder,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode()
+            etag = quote_etag(hashlib.md5(body).hexdigest())
+            entry = (etag, body)
+            set_cached_response(request, entry, tags, self.cache_timeout)
+        etag, body = entry
+        response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        return get_conditional_response(request, etag=etag, response=response)
+
+
+class PostFeedApiView(ApiView):
+    """Страница ленты по курсору: {"results": [...], "next_cursor": ...}."""
+
+    queryset = querying_posts()
+    paginate_by = NUM_PUB_PAGE
+
+    def get_feed_tags(self):
+        return (INDEX_TAG,)
+
+    def get_data(self):
+        paginator = CursorPaginator(
+            self.get_queryset().values(*POST_FIELDS), self.paginate_by
+        )
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise Http404("Неверный курсор")
+        tags = {FEEDS_TAG, *self.get_feed_tags()}
+        for row in page:
+            tags |= post_row_tags(row)
+        data = {
+            "results": [serialize_post(row) for row in page],
+            "next_cursor": page.next_cursor,
+        }
+        return data, tags
+
+
+class CategoryApiView(PostFeedApiView):
+    def get_queryset(self):
+        self.category = published_category(self.kwargs["category_slug"])
+        return querying_posts(category=self.category)
+
+    def get_feed_tags(self):
+        return (category_tag(self.category.pk),)
+
+
+class ProfileApiView(PostFeedApiView):
+    def get_queryset(self):
+        self.author = get_object_or_404(User, username=self.kwargs["username"])
+        return querying_posts(author=self.author)
+
+    def get_feed_tags(self):
+        return (author_tag(self.author.pk),)
+
+
+class PostApiView(ApiView):
+    """Пост с первой (или указанной курсором) порцией комментариев."""
+
+    queryset = querying_posts()
+    fields = POST_FIELDS
+    pk_url_kwarg = "post_id"
+
+    def serialize(self, row):
+        comments = Comment.objects.filter(post_id=row["id"]).values(
+            *COMMENT_FIELDS
+        )
+        try:
+            comments, next_cursor = comments_page(
+                comments, self.request.GET.get("cursor")
+            )
+        except InvalidCursor:
+            raise Http404("Неверный курсор")
+        data = serialize_post(row)
+        data["comments"] = [
+            serialize_comment(comment) for comment in comments
+        ]
+        data["comments_next_cursor"] = next_cursor
+        return data
+
+    def get_tags(self, row):
+        return post_row_tags(row)
@@ -0,0 +1,112 @@
+"""Асинхронные версии лент и страницы поста для ASGI.
+
+В Django 3.2 нет асинхронного ORM, а синхронные представления под ASGI
+выполняются в одном общем потоке: медленные запросы выстраиваются
+в очередь друг за другом. Здесь представление — корутина, а работа
+с базой и рендер шаблона уходят в отдельный пул потоков
+ASYNC_DB_THREADS, так что один ASGI-процесс держит много медленных
+клиентов и обслуживает до ASYNC_DB_THREADS страниц одновременно.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, update_wrapper
+from time import perf_counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from blog.views import (
+    BlogListView,
+    CategoryListView,
+    PostDetailView,
+    UserProfileView,
+)
+
+
+@lru_cache(maxsize=None)
+def db_executor(threads):
+    return ThreadPoolExecutor(threads, thread_name_prefix="blog-db")
+
+
+def _with_connections(func):
+    """У потоков пула свои соединения с базой; сигналы запроса их не
+    видят, поэтому устаревшие соединения закрываются здесь."""
+
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return wrapper
+
+
+def run_in_db_thread(func, *args, **kwargs):
+    """Выполняет синхронную func в пуле ASYNC_DB_THREADS.
+
+    При ASYNC_DB_THREADS = 0 — в общем потоке синхронного кода Django,
+    как любое синхронное представление.
+    """
+    threads = settings.ASYNC_DB_THREADS
+    if threads:
+        runner = sync_to_async(
+            _with_connections(func),
+            thread_sensitive=False,
+            executor=db_executor(threads),
+        )
+    else:
+        runner = sync_to_async(func, thread_sensitive=True)
+    return runner(*args, **kwargs)
+
+
+def render_view(view, request, *args, **kwargs):
+    """Вызывает представление и сразу рендерит TemplateResponse.
+
+    Шаблоны лент обращаются к базе при рендере, поэтому рендер должен
+    пройти в том же потоке пула, а не в общем потоке обработчика.
+    Время рендера записывается туда же, где его ждёт
+    ViewMetricsMiddleware.
+    """
+    response = view(request, *args, **kwargs)
+    if callable(getattr(response, "render", None)) and (
+        not response.is_rendered
+    ):
+        started = perf_counter()
+        response.render()
+        request._render_seconds = perf_counter() - started
+    return response
+
+
+class AsyncViewMixin:
+    """Делает из синхронного представления асинхронное: as_view()
+    возвращает корутину, которая выполняет представление целиком
+    в run_in_db_thread."""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await run_in_db_thread(
+                render_view, view, request, *args, **kwargs
+            )
+
+        update_wrapper(async_view, view)
+        return async_view
+
+
+class AsyncBlogListView(AsyncViewMixin, BlogListView):
+    pass
+
+
+class AsyncCategoryListView(AsyncViewMixin, CategoryListView):
+    pass
+
+
+class AsyncPostDetailView(AsyncViewMixin, PostDetailView):
+    pass
+
+
+class AsyncUserProfileView(AsyncViewMixin, UserProfileView):
+    pass
@@ -0,0 +1,82 @@
+"""Вход по сессии без запроса пользователя к базе.
+
+После входа каждая страница показывает шапку с именем пользователя,
+и AuthenticationMiddleware загружает его по идентификатору из сессии.
+CachedModelBackend берёт пользователя из кэша под тегом автора:
+сохранение пользователя (смена имени, пароля, прав, last_login при
+входе) сбрасывает запись через сигнал invalidate_author.
+
+Хэш пароля в кэш не попадает: кэш может лежать на диске или на общем
+сервере. Вместо него хранится хэш для проверки сессии — HMAC от
+пароля, который и так записан в саму сессию, поэтому смена пароля
+по-прежнему завершает остальные сессии. Прочие поля пользователя
+отложены и читаются из базы при первом обращении.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.cache import author_tag, versioned_key
+from blog.constants import SESSION_USER_TIMEOUT
+
+# Поля, которые нужны шапке и проверкам прав на каждой странице.
+SESSION_USER_FIELDS = (
+    "id",
+    "username",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который хранит пользователей сессий в кэше."""
+
+    def get_user(self, user_id):
+        # Из сессии приходит строка, а тег строится по ключу модели.
+        try:
+            user_id = get_user_model()._meta.pk.to_python(user_id)
+        except ValidationError:
+            return None
+        key = versioned_key(f"session-user:{user_id}", (author_tag(user_id),))
+        cached = cache.get(key)
+        if cached is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cached = {
+                "fields": {
+                    field: getattr(user, field)
+                    for field in SESSION_USER_FIELDS
+                },
+                "session_auth_hash": user.get_session_auth_hash(),
+            }
+            cache.set(key, cached, SESSION_USER_TIMEOUT)
+        return restore_user(cached)
+
+
+def restore_user(cached):
+    """Пользователь из записи кэша: остальные поля, включая пароль,
+    отложены, поэтому save() их не перезапишет."""
+    model = get_user_model()
+    # from_db ждёт значения в порядке полей модели.
+    names = [
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.attname in cached["fields"]
+    ]
+    user = model.from_db(
+        DEFAULT_DB_ALIAS, names, [cached["fields"][name] for name in names]
+    )
+
+    def get_session_auth_hash():
+        # После смены пароля (или чтения его из базы) хэш считается
+        # заново, иначе update_session_auth_hash запишет в сессию старый.
+        if "password" in user.__dict__:
+            return type(user).get_session_auth_hash(user)
+        return cached["session_auth_hash"]
+
+    user.get_session_auth_hash = get_session_auth_hash
+    return user
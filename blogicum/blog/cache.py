@@ -0,0 +1,136 @@
+"""Версионирование кэша блога через теги.
+
+Каждый тег хранит в кэше номер версии. Ключ закэшированного значения
+строится из версий его тегов, поэтому для сброса достаточно увеличить
+версию тега — старые записи перестают находиться и вытесняются сами.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+
+# Изменения, затрагивающие все ленты сразу (например, категория
+# снята с публикации).
+FEEDS_TAG = "feeds"
+INDEX_TAG = "index"
+
+
+def category_tag(category_id):
+    return f"category:{category_id}"
+
+
+def author_tag(author_id):
+    return f"author:{author_id}"
+
+
+def post_tag(post_id):
+    return f"post:{post_id}"
+
+
+def location_tag(location_id):
+    return f"location:{location_id}"
+
+
+def stats_tag(model, key):
+    """Строка сводки активности (blog.stats): меняется при записи
+    постов и комментариев, а не вместе с самой категорией или автором."""
+    return f"stats:{model._meta.model_name}:{key}"
+
+
+def post_card_tags(post):
+    """Теги всего, что выводится в карточке или на странице поста."""
+    tags = {post_tag(post.pk), author_tag(post.author_id)}
+    if post.category_id is not None:
+        tags.add(category_tag(post.category_id))
+    if post.location_id is not None:
+        tags.add(location_tag(post.location_id))
+    return tags
+
+
+def post_row_tags(row):
+    """Теги поста по строке .values(), как post_card_tags()."""
+    tags = {post_tag(row["id"]), author_tag(row["author_id"])}
+    if row["category_id"] is not None:
+        tags.add(category_tag(row["category_id"]))
+    if row["location_id"] is not None:
+        tags.add(location_tag(row["location_id"]))
+    return tags
+
+
+def _version_key(tag):
+    return f"blog:tag:{tag}"
+
+
+def _fresh_version():
+    # Версия от времени не совпадёт с вытесненной из кэша старой версией.
+    return int(time.time() * 1000)
+
+
+def tag_versions(*tags):
+    """Текущие версии тегов одним обращением к кэшу."""
+    keys = {_version_key(tag): tag for tag in tags}
+    found = cache.get_many(keys)
+    missing = {key: _fresh_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {tag: found[key] for key, tag in keys.items()}
+
+
+def bump_tags(*tags):
+    """Сбрасывает всё, что закэшировано под данными тегами."""
+    for tag in set(tags):
+        try:
+            cache.incr(_version_key(tag))
+        except ValueError:
+            cache.set(_version_key(tag), _fresh_version(), None)
+
+
+def versioned_key(name, tags):
+    """Ключ кэша, который устаревает при сбросе любого из тегов."""
+    versions = tag_versions(*tags)
+    stamp = ".".join(str(versions[tag]) for tag in tags)
+    return f"blog:{name}:{stamp}"
+
+
+def post_feed_tags(*posts_state):
+    """Теги лент, в которые попадает пост в каждом из состояний.
+
+    Состояние — словарь с author_id и category_id.
+    """
+    tags = {INDEX_TAG}
+    for state in posts_state:
+        if state.get("author_id") is not None:
+            tags.add(author_tag(state["author_id"]))
+        if state.get("category_id") is not None:
+            tags.add(category_tag(state["category_id"]))
+    return tags
+
+
+def _response_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"blog:response:{path}"
+
+
+def get_cached_response(request):
+    """Закэшированный ответ, если ни один из его тегов не сброшен."""
+    entry = cache.get(_response_key(request))
+    if entry is None:
+        return None
+    versions, response = entry
+    if versions and tag_versions(*versions) != versions:
+        return None
+    return response
+
+
+def set_cached_response(request, response, tags, timeout):
+    """Кэширует отрендеренный ответ вместе с версиями его тегов.
+
+    Версии снимаются после рендера, поэтому теги могут зависеть от того,
+    какие объекты попали на страницу.
+    """
+    cache.set(
+        _response_key(request),
+        (tag_versions(*tags), response),
+        timeout,
+    )
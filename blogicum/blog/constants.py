@@ -3,4 +3,55 @@ MAX_LENGTH_STR = 256
 
 NUM_PUB_PAGE = 10
 
+COMMENTS_PER_PAGE = 20
+
+# Число записей в RSS- и Atom-лентах
+FEED_ITEMS = 20
+
+# Сколько слов поискового запроса учитывается
+MAX_SEARCH_TERMS = 8
+
+# Наибольшая пауза publish_scheduled --loop между проверками, секунды
+SCHEDULER_INTERVAL = 60
+
 TEXT_CHAR_LIMIT = 30
+
+# Начиная с этой страницы ссылка «вперёд» ведёт в режим курсора
+CURSOR_PAGE_THRESHOLD = 5
+
+# Сколько секунд хранить в кэше число постов ленты
+FEED_COUNT_TIMEOUT = 10 * 60
+
+# До этого числа строк пагинатор считает посты точно, дальше — по оценке
+EXACT_COUNT_LIMIT = 10_000
+
+# Сколько категорий и местоположений держать в памяти процесса
+LOOKUP_CACHE_SIZE = 1_024
+
+# Сколько секунд хранить в кэше шапку страницы пользователя
+PROFILE_STATS_TIMEOUT = 60 * 60
+
+# Сколько секунд хранить в кэше сводку категории для её страницы
+CATEGORY_STATS_TIMEOUT = 60 * 60
+
+# Сколько секунд хранить в кэше пользователя вошедшей сессии
+SESSION_USER_TIMEOUT = 60 * 60
+
+# Сколько секунд хранить в кэше страницы для анонимных посетителей
+RESPONSE_CACHE_TIMEOUT = 5 * 60
+
+# Сколько секунд хранить в кэше отрендеренную карточку поста
+POST_CARD_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Ширины уменьшенных копий изображения поста: обычная и для retina
+IMAGE_WIDTHS = {
+    "card": (640, 1280),
+    "detail": (1200, 2400),
+}
+
+# Сколько потоков готовят уменьшенные копии изображений
+IMAGE_WORKERS = 2
+
+# Ограничения на загружаемые изображения постов
+MAX_IMAGE_UPLOAD_SIZE = 20 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40_000_000
@@ -0,0 +1,67 @@
+"""Выгрузка и загрузка данных блога в формате JSON Lines.
+
+Одна строка — один объект в формате сериализатора Django "jsonl",
+модели идут в порядке DUMP_MODELS: сначала те, на кого ссылаются.
+Файлы с расширением .gz сжимаются и читаются на лету.
+"""
+import gzip
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.db.models import Q
+from django.utils import timezone
+
+from blog.models import Post
+from blog.secondary_func import actual_comment_count
+
+DUMP_MODELS = (
+    "auth.user",
+    "blog.location",
+    "blog.category",
+    "blog.post",
+    "blog.comment",
+)
+
+
+def dump_models():
+    return [apps.get_model(label) for label in DUMP_MODELS]
+
+
+def open_dump(path, mode):
+    """Открывает файл выгрузки в текстовом режиме mode ("r" или "w")."""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+@contextmanager
+def preserve_timestamps(models):
+    """Отключает auto_now и auto_now_add, чтобы при вставке остались
+    даты из выгрузки, а не время загрузки."""
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+        or getattr(field, "auto_now_add", False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def reconcile_posts():
+    """Пересчитывает денормализованные поля постов после загрузки.
+
+    При массовой вставке сигналы не срабатывают, поэтому счётчики
+    комментариев и признак is_live выставляются одним проходом.
+    """
+    Post.objects.update(comment_count=actual_comment_count())
+    live = Q(is_published=True, pub_date__lte=timezone.now())
+    Post.objects.filter(live).update(is_live=True)
+    Post.objects.exclude(live).update(is_live=False)
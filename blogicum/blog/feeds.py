@@ -0,0 +1,139 @@
+"""RSS- и Atom-ленты блога.
+
+XML ленты строится один раз и хранится в кэше под тегами ленты и
+вошедших в неё постов, поэтому публикация, правка или снятие поста
+с публикации пересобирают только затронутые ленты. Отложенный пост
+сбрасывает их так же, когда publish_scheduled переводит его в ленты.
+"""
+import hashlib
+
+from django.contrib.syndication.views import Feed
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from blog.cache import (
+    FEEDS_TAG,
+    INDEX_TAG,
+    category_tag,
+    get_cached_response,
+    post_row_tags,
+    set_cached_response,
+)
+from blog.constants import FEED_ITEMS
+from blog.lookups import attach_lookups, published_category
+from blog.secondary_func import querying_posts
+
+
+class StoredFeed(Feed):
+    """Лента, которая отдаётся из сохранённого документа.
+
+    Наследники задают feed_filter(obj) — условия отбора постов ленты
+    для querying_posts() — и feed_tags(obj).
+    """
+
+    def feed_filter(self, obj):
+        return {}
+
+    def feed_tags(self, obj):
+        return ()
+
+    def items(self, obj):
+        return querying_posts(**self.feed_filter(obj))[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.text
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        attach_lookups((item,))
+        return (item.category.title,) if item.category else ()
+
+    def __call__(self, request, *args, **kwargs):
+        entry = get_cached_response(request)
+        if entry is None:
+            entry = self._build(request, *args, **kwargs)
+        content_type, body, etag, last_modified = entry
+        response = HttpResponse(body, content_type=content_type)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return get_conditional_response(
+            request, etag=etag, last_modified=last_modified, response=response
+        )
+
+    def _build(self, request, *args, **kwargs):
+        try:
+            obj = self.get_object(request, *args, **kwargs)
+        except ObjectDoesNotExist:
+            raise Http404("Лента не найдена")
+        feedgen = self.get_feed(obj, request)
+        body = feedgen.writeString("utf-8").encode()
+        entry = (
+            feedgen.content_type,
+            body,
+            quote_etag(hashlib.md5(body).hexdigest()),
+            int(feedgen.latest_post_date().timestamp()),
+        )
+        rows = self.items(obj).values(
+            "id", "author_id", "category_id", "location_id"
+        )
+        tags = {FEEDS_TAG, *self.feed_tags(obj)}
+        for row in rows:
+            tags |= post_row_tags(row)
+        set_cached_response(request, entry, tags, None)
+        return entry
+
+
+class LatestPostsFeed(StoredFeed):
+    title = "Блогикум"
+    link = reverse_lazy("blog:index")
+    description = "Новые публикации Блогикума"
+
+    def feed_tags(self, obj):
+        return (INDEX_TAG,)
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryFeed(StoredFeed):
+    def get_object(self, request, category_slug):
+        return published_category(category_slug)
+
+    def title(self, obj):
+        return f"Блогикум: {obj.title}"
+
+    def link(self, obj):
+        return reverse("blog:category_posts", args=[obj.slug])
+
+    def description(self, obj):
+        return obj.description
+
+    def feed_filter(self, obj):
+        return {"category": obj}
+
+    def feed_tags(self, obj):
+        return (category_tag(obj.pk),)
+
+
+class CategoryAtomFeed(CategoryFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return obj.description
@@ -1,7 +1,40 @@
 from django import forms
 from django.forms import Textarea
+from PIL import Image
 
 from .models import Comment, Post
+from .uploads import read_image_header
+
+
+class LazyImageField(forms.ImageField):
+    """ImageField, который проверяет только заголовок изображения.
+
+    В отличие от forms.ImageField не вызывает verify() и не читает
+    файл целиком: достаточно того, что Pillow распознал формат,
+    а размеры не превышают допустимых.
+    """
+
+    def to_python(self, data):
+        f = forms.FileField.to_python(self, data)
+        if f is None:
+            return None
+        if hasattr(data, "temporary_file_path"):
+            file = data.temporary_file_path()
+        else:
+            file = data
+        try:
+            image = read_image_header(file)
+        except forms.ValidationError:
+            raise
+        except Exception as exc:
+            raise forms.ValidationError(
+                self.error_messages["invalid_image"], code="invalid_image"
+            ) from exc
+        f.image = image
+        f.content_type = Image.MIME.get(image.format)
+        if hasattr(f, "seek") and callable(f.seek):
+            f.seek(0)
+        return f
 
 
 class PostForm(forms.ModelForm):
@@ -17,6 +50,7 @@ class PostForm(forms.ModelForm):
             "category",
             "image",
         ]
+        field_classes = {"image": LazyImageField}
         widgets = {
             "pub_date": forms.DateTimeInput(
                 format="%Y-%m-%d %H:%M", attrs={"type": "datetime-local"}
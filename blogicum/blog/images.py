@@ -0,0 +1,134 @@
+"""Уменьшенные копии изображений постов.
+
+Копии готовятся в пуле потоков после коммита транзакции, чтобы запрос
+на создание или правку поста не ждал Pillow. Файлы лежат рядом
+с оригиналом: post_images/photo.jpg -> post_images/photo.640w.jpg.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from blog.cache import bump_tags, post_tag
+from blog.constants import IMAGE_WIDTHS, IMAGE_WORKERS
+from blog.models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=IMAGE_WORKERS, thread_name_prefix="post-images"
+)
+
+# Ещё не выполненные задания пула, см. wait_for_variants().
+_pending = set()
+
+ALL_WIDTHS = sorted(
+    {width for widths in IMAGE_WIDTHS.values() for width in widths}
+)
+
+
+def variant_name(name, width):
+    root, _ = os.path.splitext(name)
+    return f"{root}.{width}w.jpg"
+
+
+def stored_image_name(post):
+    """Имя изображения поста в базе до сохранения; None для нового."""
+    if post._state.adding:
+        return None
+    loaded = getattr(post, "_loaded_values", {})
+    if "image" in loaded:
+        return loaded["image"]
+    return (
+        Post.objects.filter(pk=post.pk)
+        .values_list("image", flat=True)
+        .first()
+    )
+
+
+def build_variants(post_id):
+    """Готовит копии изображения поста и записывает их в пост.
+
+    В Post.image_variants сохраняются ширина оригинала и ширины копий;
+    копии не шире оригинала не создаются.
+    """
+    post = Post.objects.filter(pk=post_id).only("image").first()
+    if post is None or not post.image:
+        return []
+    storage = post.image.storage
+    with post.image.open("rb") as original:
+        image = ImageOps.exif_transpose(Image.open(original))
+        image.load()
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    widths = [width for width in ALL_WIDTHS if width < image.width]
+    for width in widths:
+        name = variant_name(post.image.name, width)
+        variant = image.copy()
+        variant.thumbnail((width, image.height), Image.LANCZOS)
+        buffer = BytesIO()
+        variant.save(
+            buffer, "JPEG", quality=82, optimize=True, progressive=True
+        )
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(buffer.getvalue()))
+    variants = {"width": image.width, "widths": widths}
+    if not Post.objects.filter(pk=post_id, image=post.image.name).update(
+        image_variants=variants, updated_at=timezone.now()
+    ):
+        # Картинку за это время заменили или убрали: копии старой
+        # никому не нужны, а её собственную очистку мы могли обогнать.
+        delete_variants(storage, post.image.name)
+        return []
+    bump_tags(post_tag(post_id))
+    return variants
+
+
+def delete_variants(storage, name):
+    """Удаляет копии изображения name всех ширин."""
+    for width in ALL_WIDTHS:
+        variant = variant_name(name, width)
+        if storage.exists(variant):
+            storage.delete(variant)
+
+
+def _build_in_worker(post_id):
+    close_old_connections()
+    try:
+        build_variants(post_id)
+    except Exception:
+        logger.exception(
+            "Не удалось подготовить копии изображения поста %s", post_id
+        )
+    finally:
+        close_old_connections()
+
+
+def _submit(post_id):
+    future = _executor.submit(_build_in_worker, post_id)
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+
+
+def schedule_variants(post):
+    """Ставит подготовку копий в очередь после коммита транзакции."""
+    post_id = post.pk
+    transaction.on_commit(lambda: _submit(post_id))
+
+
+def schedule_variant_cleanup(post, name):
+    """Удаляет копии прежнего изображения name после коммита
+    транзакции, в которой его заменили или убрали."""
+    storage = post.image.storage
+    transaction.on_commit(lambda: delete_variants(storage, name))
+
+
+def wait_for_variants(timeout=None):
+    """Ждёт, пока пул подготовит все поставленные в очередь копии."""
+    wait(list(_pending), timeout)
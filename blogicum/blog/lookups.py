@@ -0,0 +1,149 @@
+"""Категории и местоположения из памяти процесса.
+
+Таблицы маленькие и меняются редко, а нужны почти на каждой странице:
+категория по slug в ленте категории, категория и место в каждой
+карточке поста. LookupCache держит последние использованные объекты
+в LRU процесса. Правка объекта сбрасывает LRU в своём процессе сразу,
+а в остальных — через версию тега в общем кэше (blog.cache), которую
+каждый процесс сверяет не чаще раза в LOOKUP_CACHE_CHECK_INTERVAL
+секунд.
+"""
+import copy
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+from django.conf import settings
+from django.http import Http404
+
+from blog import metrics
+from blog.cache import bump_tags, tag_versions
+from blog.constants import LOOKUP_CACHE_SIZE
+from blog.models import Category, Location, Post
+
+
+class LookupCache:
+    """LRU объектов модели по первичному ключу и уникальным полям."""
+
+    def __init__(self, name, model, fields=(), maxsize=LOOKUP_CACHE_SIZE):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.maxsize = maxsize
+        self.tag = f"lookup:{name}"
+        self._lock = threading.Lock()
+        self._objects = OrderedDict()
+        # (поле, значение) -> первичный ключ
+        self._index = {}
+        self._version = None
+        self._checked = None
+
+    def get(self, **lookup):
+        """Объект по одному полю (pk или из fields) или None."""
+        ((field, value),) = lookup.items()
+        self._sync()
+        with self._lock:
+            pk = value if field == "pk" else self._index.get((field, value))
+            obj = self._objects.get(pk)
+            if obj is not None:
+                self._objects.move_to_end(pk)
+        if obj is not None:
+            metrics.observe_lookup(self.name, hits=1)
+        else:
+            metrics.observe_lookup(self.name, misses=1)
+            obj = self.model._default_manager.filter(**lookup).first()
+            if obj is None:
+                return None
+            self._store(obj)
+        return copy.copy(obj)
+
+    def get_many(self, pks):
+        """{pk: объект} для набора ключей; промахи — одним запросом."""
+        self._sync()
+        found = {}
+        with self._lock:
+            for pk in set(pks):
+                obj = self._objects.get(pk)
+                if obj is not None:
+                    self._objects.move_to_end(pk)
+                    found[pk] = obj
+        missing = set(pks) - found.keys()
+        metrics.observe_lookup(
+            self.name, hits=len(found), misses=len(missing)
+        )
+        if missing:
+            for obj in self.model._default_manager.filter(pk__in=missing):
+                self._store(obj)
+                found[obj.pk] = obj
+        return {pk: copy.copy(obj) for pk, obj in found.items()}
+
+    def invalidate(self):
+        """Сбрасывает LRU во всех процессах."""
+        bump_tags(self.tag)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._objects.clear()
+            self._index.clear()
+            self._version = None
+
+    def _store(self, obj):
+        with self._lock:
+            self._objects[obj.pk] = obj
+            for field in self.fields:
+                self._index[field, getattr(obj, field)] = obj.pk
+            while len(self._objects) > self.maxsize:
+                _, evicted = self._objects.popitem(last=False)
+                for field in self.fields:
+                    self._index.pop((field, getattr(evicted, field)), None)
+
+    def _sync(self):
+        now = monotonic()
+        if self._checked is not None and (
+            now - self._checked < settings.LOOKUP_CACHE_CHECK_INTERVAL
+        ):
+            return
+        version = tag_versions(self.tag)[self.tag]
+        with self._lock:
+            if version != self._version:
+                self._objects.clear()
+                self._index.clear()
+                self._version = version
+        self._checked = now
+
+
+categories = LookupCache("category", Category, fields=("slug",))
+locations = LookupCache("location", Location)
+
+
+def published_category(slug):
+    """Опубликованная категория по slug или Http404."""
+    category = categories.get(slug=slug)
+    if category is None or not category.is_published:
+        raise Http404
+    return category
+
+
+def attach_lookups(posts):
+    """Подставляет постам категорию и место из LRU вместо запросов.
+
+    Посты, у которых связь уже загружена (select_related), не трогает.
+    """
+    for field, lookup in (("category", categories), ("location", locations)):
+        descriptor = getattr(Post, field)
+        pending = [
+            post
+            for post in posts
+            if not descriptor.is_cached(post)
+            and getattr(post, f"{field}_id") is not None
+        ]
+        if not pending:
+            continue
+        found = lookup.get_many(
+            [getattr(post, f"{field}_id") for post in pending]
+        )
+        for post in pending:
+            obj = found.get(getattr(post, f"{field}_id"))
+            if obj is not None:
+                setattr(post, field, obj)
@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from io import BytesIO
+from time import perf_counter
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.management.commands.bench_load import SAMPLE_SIZE, percentile
+from blog.models import Category, User
+from blog.secondary_func import querying_posts
+
+INTERFACES = ("wsgi", "asgi")
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность одного WSGI-процесса с пулом "
+        "потоков и одного ASGI-процесса с асинхронными представлениями "
+        "на одних и тех же страницах. Каждый интерфейс замеряется в "
+        "отдельном процессе без сети: обработчики Django вызываются "
+        "напрямую, медленный клиент читает ответ --client-delay мс. "
+        "Задержки WSGI не включают ожидание свободного потока, поэтому "
+        "сравнивать стоит прежде всего пропускную способность. "
+        "Запускайте с --settings=blogicum.settings_production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interface",
+            action="append",
+            choices=INTERFACES,
+            help="Интерфейс для замера; можно несколько. По умолчанию — оба.",
+        )
+        parser.add_argument("--requests", type=int, default=1_000)
+        parser.add_argument(
+            "--clients",
+            type=int,
+            default=100,
+            help="Сколько клиентов одновременно ждут ответа.",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Рабочих потоков WSGI-сервера.",
+        )
+        parser.add_argument(
+            "--client-delay",
+            type=float,
+            default=50,
+            help="Сколько миллисекунд клиент читает ответ.",
+        )
+        parser.add_argument(
+            "--output", help="Файл для JSON-отчёта вместо stdout."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--worker", choices=INTERFACES, help=argparse.SUPPRESS
+        )
+
+    def handle(self, *args, **options):
+        if options["worker"]:
+            paths = json.load(sys.stdin)
+            self.stdout.write(json.dumps(self.measure(paths, options)))
+            return
+        paths = self.sample_paths(options["requests"], options["seed"])
+        report = {
+            "requests": options["requests"],
+            "clients": options["clients"],
+            "client_delay_ms": options["client_delay"],
+            "interfaces": {},
+        }
+        for interface in options["interface"] or INTERFACES:
+            report["interfaces"][interface] = self.spawn(
+                interface, paths, options
+            )
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+    @staticmethod
+    def sample_paths(total, seed):
+        """Одна и та же смесь страниц для обоих интерфейсов."""
+        post_ids = list(
+            querying_posts()
+            .order_by("?")
+            .values_list("id", flat=True)[:SAMPLE_SIZE]
+        )
+        slugs = list(
+            Category.objects.filter(is_published=True)
+            .values_list("slug", flat=True)[:SAMPLE_SIZE]
+        )
+        usernames = list(
+            User.objects.filter(posts__isnull=False)
+            .distinct()
+            .values_list("username", flat=True)[:SAMPLE_SIZE]
+        )
+        if not (post_ids and slugs and usernames):
+            raise CommandError(
+                "Нет данных для замера; сначала запустите generate_data."
+            )
+        choose = random.Random(seed).choice
+        pages = (
+            lambda: "/",
+            lambda: f"/category/{choose(slugs)}/",
+            lambda: f"/posts/{choose(post_ids)}/",
+            lambda: f"/profile/{choose(usernames)}/",
+        )
+        return [choose(pages)() for _ in range(total)]
+
+    def spawn(self, interface, paths, options):
+        """Замеряет интерфейс в дочернем процессе: набор представлений
+        выбирается в urls при запуске, по BLOGICUM_ASYNC_VIEWS."""
+        command = [
+            sys.executable,
+            str(settings.BASE_DIR / "manage.py"),
+            "bench_asgi",
+            "--worker",
+            interface,
+            "--clients",
+            str(options["clients"]),
+            "--threads",
+            str(options["threads"]),
+            "--client-delay",
+            str(options["client_delay"]),
+        ]
+        env = {
+            **os.environ,
+            "BLOGICUM_ASYNC_VIEWS": "1" if interface == "asgi" else "0",
+        }
+        result = subprocess.run(
+            command,
+            input=json.dumps(paths),
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr)
+        return json.loads(result.stdout)
+
+    def measure(self, paths, options):
+        delay = options["client_delay"] / 1000
+        started = perf_counter()
+        if options["worker"] == "wsgi":
+            latencies, errors = self.run_wsgi(
+                paths, min(options["threads"], options["clients"]), delay
+            )
+            result = {"threads": options["threads"]}
+        else:
+            latencies, errors = asyncio.run(
+                self.run_asgi(paths, options["clients"], delay)
+            )
+            result = {"db_threads": settings.ASYNC_DB_THREADS}
+        wall = perf_counter() - started
+        latencies.sort()
+        result.update(
+            {
+                "errors": errors,
+                "seconds": round(wall, 3),
+                "throughput_rps": round(len(paths) / wall, 1),
+            }
+        )
+        if latencies:
+            result.update(
+                {
+                    f"{name}_ms": round(value * 1000, 2)
+                    for name, value in (
+                        ("mean", statistics.fmean(latencies)),
+                        ("p50", percentile(latencies, 0.50)),
+                        ("p95", percentile(latencies, 0.95)),
+                        ("p99", percentile(latencies, 0.99)),
+                    )
+                }
+            )
+        return result
+
+    @staticmethod
+    def run_wsgi(paths, threads, delay):
+        """Потоковый WSGI-сервер: пока клиент читает ответ, поток
+        сервера занят им."""
+        handler = WSGIHandler()
+        remaining = iter(paths)
+        lock = threading.Lock()
+        latencies = []
+        errors = 0
+
+        def worker():
+            nonlocal errors
+            while True:
+                with lock:
+                    path = next(remaining, None)
+                if path is None:
+                    return
+                statuses = []
+                started = perf_counter()
+                response = handler(
+                    {
+                        "REQUEST_METHOD": "GET",
+                        "PATH_INFO": path,
+                        "QUERY_STRING": "",
+                        "SCRIPT_NAME": "",
+                        "SERVER_NAME": "localhost",
+                        "SERVER_PORT": "80",
+                        "SERVER_PROTOCOL": "HTTP/1.1",
+                        "HTTP_HOST": "localhost",
+                        "REMOTE_ADDR": "127.0.0.1",
+                        "wsgi.input": BytesIO(),
+                        "wsgi.errors": sys.stderr,
+                        "wsgi.url_scheme": "http",
+                    },
+                    lambda status, headers, exc_info=None: statuses.append(
+                        status
+                    ),
+                )
+                try:
+                    b"".join(response)
+                    time.sleep(delay)
+                finally:
+                    response.close()
+                elapsed = perf_counter() - started
+                with lock:
+                    if statuses[0].startswith("200"):
+                        latencies.append(elapsed)
+                    else:
+                        errors += 1
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return latencies, errors
+
+    @staticmethod
+    async def run_asgi(paths, clients, delay):
+        """Один цикл событий: медленный клиент ждёт в send(), не занимая
+        поток."""
+        handler = ASGIHandler()
+        remaining = iter(paths)
+        latencies = []
+        errors = 0
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def client():
+            nonlocal errors
+            for path in remaining:
+                messages = []
+
+                async def send(message):
+                    messages.append(message)
+                    if message["type"] == "http.response.body" and not (
+                        message.get("more_body")
+                    ):
+                        await asyncio.sleep(delay)
+
+                started = perf_counter()
+                await handler(
+                    {
+                        "type": "http",
+                        "asgi": {"version": "3.0"},
+                        "http_version": "1.1",
+                        "method": "GET",
+                        "scheme": "http",
+                        "path": path,
+                        "raw_path": path.encode(),
+                        "query_string": b"",
+                        "root_path": "",
+                        "headers": [(b"host", b"localhost")],
+                        "client": ("127.0.0.1", 0),
+                        "server": ("localhost", 80),
+                    },
+                    receive,
+                    send,
+                )
+                elapsed = perf_counter() - started
+                if messages[0]["status"] == 200:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return latencies, errors
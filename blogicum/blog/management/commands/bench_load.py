@@ -0,0 +1,235 @@
+import json
+import random
+import statistics
+import threading
+from io import BytesIO
+from time import perf_counter
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from PIL import Image
+
+from blog.constants import NUM_PUB_PAGE
+from blog.images import variant_name, wait_for_variants
+from blog.models import Category, Comment, Post, User
+from blog.secondary_func import querying_posts
+
+# Сколько объектов каждого вида выбирается для случайных запросов.
+SAMPLE_SIZE = 1_000
+BENCH_MARK = "bench_load"
+READ_SCENARIOS = ("index", "index_deep", "category", "profile", "detail")
+# Пишущие сценарии требуют входа и убирают за собой созданное.
+WRITE_SCENARIOS = ("comment_create", "image_upload")
+SCENARIOS = READ_SCENARIOS + WRITE_SCENARIOS
+
+
+def percentile(sorted_values, share):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * share))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный замер представлений блога: несколько потоков "
+        "выполняют запросы через весь стек Django (промежуточные слои, "
+        "кэш, шаблоны) и сообщают p50/p95/p99 и пропускную способность "
+        "в JSON. Запускайте с --settings=blogicum.settings_production, "
+        "чтобы не мешала панель отладки. Данные — generate_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=SCENARIOS,
+            help="Сценарий замера; можно несколько. По умолчанию — все.",
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--anonymous",
+            action="store_true",
+            help="Читать страницы без входа (работает кэш ответов).",
+        )
+        parser.add_argument(
+            "--output", help="Файл для JSON-отчёта вместо stdout."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.anonymous = options["anonymous"]
+        scenarios = options["scenario"] or (
+            READ_SCENARIOS if self.anonymous else SCENARIOS
+        )
+        if self.anonymous and set(scenarios) & set(WRITE_SCENARIOS):
+            raise CommandError(
+                "Пишущие сценарии выполняются только после входа."
+            )
+        self.load_samples()
+        self.image = self.build_image()
+        report = {
+            "vendor": connection.vendor,
+            "concurrency": options["concurrency"],
+            "anonymous": self.anonymous,
+            "scenarios": {},
+        }
+        try:
+            for name in scenarios:
+                report["scenarios"][name] = self.run(
+                    getattr(self, f"scenario_{name}"),
+                    # Успешная запись заканчивается редиректом, а 200 —
+                    # это форма с ошибками.
+                    302 if name in WRITE_SCENARIOS else 200,
+                    options["requests"],
+                    options["concurrency"],
+                )
+        finally:
+            self.cleanup()
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+    def load_samples(self):
+        self.post_ids = list(
+            querying_posts()
+            .order_by("?")
+            .values_list("id", flat=True)[:SAMPLE_SIZE]
+        )
+        self.category_slugs = list(
+            Category.objects.filter(is_published=True)
+            .values_list("slug", flat=True)[:SAMPLE_SIZE]
+        )
+        self.users = list(
+            User.objects.filter(posts__isnull=False)
+            .distinct()
+            .order_by("?")[:SAMPLE_SIZE]
+        )
+        if not (self.post_ids and self.category_slugs and self.users):
+            raise CommandError(
+                "Нет данных для замера; сначала запустите generate_data."
+            )
+        # Страница из середины ленты: OFFSET дорогой, COUNT из кэша.
+        self.deep_page = max(1, querying_posts().count() // NUM_PUB_PAGE // 2)
+
+    @staticmethod
+    def build_image():
+        buffer = BytesIO()
+        Image.new("RGB", (1600, 1200), color=(73, 109, 137)).save(
+            buffer, format="JPEG"
+        )
+        return buffer.getvalue()
+
+    def client(self):
+        client = Client(HTTP_HOST="localhost")
+        if not self.anonymous:
+            client.force_login(self.random.choice(self.users))
+        return client
+
+    def run(self, scenario, expected_status, total, concurrency):
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        remaining = iter(range(total))
+
+        def worker():
+            client = self.client()
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        break
+                started = perf_counter()
+                try:
+                    response = scenario(client)
+                    ok = response.status_code == expected_status
+                except Exception:
+                    ok = False
+                elapsed = perf_counter() - started
+                with lock:
+                    (latencies if ok else errors).append(elapsed)
+            connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        started = perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = perf_counter() - started
+        latencies.sort()
+        result = {
+            "requests": total,
+            "errors": len(errors),
+            "seconds": round(wall, 3),
+            "throughput_rps": round(total / wall, 1),
+        }
+        if latencies:
+            result.update(
+                {
+                    f"{name}_ms": round(value * 1000, 2)
+                    for name, value in (
+                        ("mean", statistics.fmean(latencies)),
+                        ("p50", percentile(latencies, 0.50)),
+                        ("p95", percentile(latencies, 0.95)),
+                        ("p99", percentile(latencies, 0.99)),
+                        ("max", latencies[-1]),
+                    )
+                }
+            )
+        return result
+
+    def scenario_index(self, client):
+        return client.get("/")
+
+    def scenario_index_deep(self, client):
+        return client.get("/", {"page": self.deep_page})
+
+    def scenario_category(self, client):
+        slug = self.random.choice(self.category_slugs)
+        return client.get(f"/category/{slug}/")
+
+    def scenario_profile(self, client):
+        user = self.random.choice(self.users)
+        return client.get(f"/profile/{user.username}/")
+
+    def scenario_detail(self, client):
+        return client.get(f"/posts/{self.random.choice(self.post_ids)}/")
+
+    def scenario_comment_create(self, client):
+        post_id = self.random.choice(self.post_ids)
+        return client.post(
+            f"/posts/{post_id}/comment/", {"text": BENCH_MARK}
+        )
+
+    def scenario_image_upload(self, client):
+        return client.post(
+            "/posts/create/",
+            {
+                "title": BENCH_MARK,
+                "text": BENCH_MARK,
+                "pub_date": "2000-01-01 00:00",
+                "category": Category.objects.filter(
+                    slug=self.random.choice(self.category_slugs)
+                ).values_list("id", flat=True)[0],
+                "image": SimpleUploadedFile(
+                    "bench.jpg", self.image, content_type="image/jpeg"
+                ),
+            },
+        )
+
+    def cleanup(self):
+        """Удаляет комментарии и посты, созданные замером."""
+        wait_for_variants()
+        Comment.objects.filter(text=BENCH_MARK).delete()
+        for post in Post.objects.filter(title=BENCH_MARK, text=BENCH_MARK):
+            if post.image:
+                storage, name = post.image.storage, post.image.name
+                for width in post.image_variants.get("widths", ()):
+                    storage.delete(variant_name(name, width))
+                storage.delete(name)
+            post.delete()
@@ -0,0 +1,85 @@
+import statistics
+from datetime import timedelta
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog.constants import NUM_PUB_PAGE
+from blog.models import Category, Post, User
+from blog.search import _substring_search, search_posts, search_terms
+from blog.secondary_func import querying_posts
+from blog.synthetic import TextGenerator
+
+# Ранги слов запросов в частотном словаре: от частых к редким.
+QUERY_RANKS = ((3,), (100,), (2_000,), (15_000,), (100, 2_000))
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер полнотекстового поиска на синтетических постах: индекс "
+        "FTS5 против поиска подстроки. Посты создаются во временной "
+        "транзакции и удаляются после замера."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=1_000_000)
+        parser.add_argument("--batch", type=int, default=5_000)
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Повторов каждого запроса."
+        )
+
+    def handle(self, *args, **options):
+        self.text = TextGenerator()
+        with transaction.atomic():
+            self.generate(options["posts"], options["batch"])
+            self.stdout.write("запрос: fts5 / подстрока, мс (медиана)")
+            for ranks in QUERY_RANKS:
+                query = " ".join(
+                    self.text.word(rank) + "ами" for rank in ranks
+                )
+                fts = self.measure(
+                    lambda: search_posts(query), options["repeat"]
+                )
+                substring = self.measure(
+                    lambda: _substring_search(
+                        querying_posts(), search_terms(query)
+                    ),
+                    options["repeat"],
+                )
+                self.stdout.write(f"{query!r}: {fts:.1f} / {substring:.1f}")
+            transaction.set_rollback(True)
+
+    def generate(self, total, batch):
+        author = User.objects.create(username="bench_search_author")
+        category = Category.objects.create(
+            title="Замер поиска", description="", slug="bench-search"
+        )
+        now = timezone.now()
+        started = perf_counter()
+        for offset in range(0, total, batch):
+            Post.objects.bulk_create(
+                Post(
+                    title=self.text.sentence(4),
+                    text=self.text.sentence(60),
+                    pub_date=now - timedelta(minutes=offset + number),
+                    author=author,
+                    category=category,
+                    # bulk_create не вызывает сигналы, ставящие is_live.
+                    is_live=True,
+                )
+                for number in range(min(batch, total - offset))
+            )
+        self.stdout.write(
+            f"создано постов: {total} за {perf_counter() - started:.1f} с"
+        )
+
+    @staticmethod
+    def measure(build_queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = perf_counter()
+            list(build_queryset()[:NUM_PUB_PAGE])
+            timings.append((perf_counter() - started) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,98 @@
+import json
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from blog.models import Category, User
+from blog.secondary_func import querying_posts
+
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+CACHED_BACKEND = "blog.backends.CachedModelBackend"
+USER_BACKENDS = {"db": MODEL_BACKEND, "cached": CACHED_BACKEND}
+
+
+class Command(BaseCommand):
+    help = (
+        "Считает SQL-запросы на страницу после входа для каждого "
+        "хранилища сессий (SESSION_ENGINES) с загрузкой пользователя "
+        "из базы и из кэша. Отдельно показывает запросы к django_session "
+        "и auth_user — их и убирают cached_db, signed_cookies и "
+        "CachedModelBackend. Данные — generate_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument(
+            "--output", help="Файл для JSON-отчёта вместо stdout."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        choose = random.Random(options["seed"]).choice
+        user = User.objects.filter(posts__isnull=False).first()
+        post_ids = list(querying_posts().values_list("id", flat=True)[:100])
+        slugs = list(
+            Category.objects.filter(is_published=True)
+            .values_list("slug", flat=True)[:100]
+        )
+        if not (user and post_ids and slugs):
+            raise CommandError(
+                "Нет данных для замера; сначала запустите generate_data."
+            )
+        pages = (
+            lambda: "/",
+            lambda: f"/category/{choose(slugs)}/",
+            lambda: f"/posts/{choose(post_ids)}/",
+            lambda: f"/profile/{user.username}/",
+        )
+        paths = [choose(pages)() for _ in range(options["requests"])]
+        # Кэши лент, карточек и справочников прогреваются заранее, чтобы
+        # варианты различались только сессией и пользователем.
+        warmup = Client(HTTP_HOST="localhost")
+        warmup.force_login(user)
+        for path in set(paths):
+            warmup.get(path)
+        report = {"requests": len(paths), "variants": {}}
+        for engine, engine_path in settings.SESSION_ENGINES.items():
+            for source, backend in USER_BACKENDS.items():
+                with override_settings(
+                    SESSION_ENGINE=engine_path,
+                    AUTHENTICATION_BACKENDS=[backend],
+                ):
+                    report["variants"][f"{engine}+{source}_user"] = (
+                        self.measure(user, paths)
+                    )
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+    @staticmethod
+    def measure(user, paths):
+        client = Client(HTTP_HOST="localhost")
+        client.force_login(user)
+        # Первая страница заполняет кэш сессии и пользователя.
+        client.get(paths[0])
+        totals = {"session": 0, "user": 0, "total": 0}
+        for path in paths:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(path)
+            if response.status_code != 200:
+                raise CommandError(f"{path}: {response.status_code}")
+            for query in queries:
+                sql = query["sql"]
+                totals["total"] += 1
+                if 'FROM "django_session"' in sql:
+                    totals["session"] += 1
+                elif 'FROM "auth_user" WHERE "auth_user"."id" =' in sql:
+                    totals["user"] += 1
+        return {
+            f"{name}_queries_per_page": round(value / len(paths), 2)
+            for name, value in totals.items()
+        }
@@ -0,0 +1,93 @@
+import threading
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+
+from blog.constants import NUM_PUB_PAGE
+from blog.models import Comment
+from blog.secondary_func import querying_posts
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный замер SQLite: параллельное чтение ленты и запись "
+        "комментариев. Сравните запуск с --settings="
+        "blogicum.settings_production и без него."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument(
+            "--seconds", type=float, default=10, help="Длительность замера."
+        )
+
+    def handle(self, *args, **options):
+        post = querying_posts().first()
+        if post is None:
+            raise CommandError("Нет опубликованных постов для замера.")
+        self.post = post
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.stats = {"reads": 0, "writes": 0, "errors": 0}
+        self.created = []
+        workers = [
+            threading.Thread(target=self.worker, args=(self.read,))
+            for _ in range(options["readers"])
+        ] + [
+            threading.Thread(target=self.worker, args=(self.write,))
+            for _ in range(options["writers"])
+        ]
+        started = perf_counter()
+        for worker in workers:
+            worker.start()
+        self.stop.wait(options["seconds"])
+        self.stop.set()
+        for worker in workers:
+            worker.join()
+        elapsed = perf_counter() - started
+        Comment.objects.filter(pk__in=self.created).delete()
+
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+        conn_max_age = settings.DATABASES["default"].get("CONN_MAX_AGE", 0)
+        self.stdout.write(
+            f"journal_mode={journal_mode}, CONN_MAX_AGE={conn_max_age}"
+        )
+        for name in ("reads", "writes"):
+            self.stdout.write(
+                f"{name}: {self.stats[name]} "
+                f"({self.stats[name] / elapsed:.1f}/с)"
+            )
+        self.stdout.write(f"database is locked: {self.stats['errors']}")
+
+    def worker(self, operation):
+        while not self.stop.is_set():
+            # Границы запроса: как request_started/request_finished,
+            # соединение закрывается, если CONN_MAX_AGE истёк.
+            close_old_connections()
+            try:
+                operation()
+            except OperationalError:
+                with self.lock:
+                    self.stats["errors"] += 1
+            close_old_connections()
+        connection.close()
+
+    def read(self):
+        list(querying_posts()[:NUM_PUB_PAGE])
+        with self.lock:
+            self.stats["reads"] += 1
+
+    def write(self):
+        comment = Comment.objects.create(
+            text="Нагрузочный комментарий",
+            author_id=self.post.author_id,
+            post_id=self.post.pk,
+        )
+        with self.lock:
+            self.stats["writes"] += 1
+            self.created.append(comment.pk)
@@ -0,0 +1,84 @@
+from copy import deepcopy
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template.loader import get_template
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from blog.constants import NUM_PUB_PAGE
+from blog.models import Category, Location, Post, User
+
+LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+# Кэш карточек отключён, чтобы мерить именно загрузку и рендер шаблонов.
+DUMMY_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+}
+
+
+def templates_with_loaders(loaders):
+    templates = deepcopy(settings.TEMPLATES)
+    templates[0]["APP_DIRS"] = False
+    templates[0]["OPTIONS"]["loaders"] = loaders
+    return templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает время рендера blog/index.html с карточками постов "
+        "с кэширующим загрузчиком шаблонов и без него."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        profiles = {
+            "без кэша шаблонов": templates_with_loaders(LOADERS),
+            "cached.Loader": templates_with_loaders(
+                [("django.template.loaders.cached.Loader", LOADERS)]
+            ),
+        }
+        context = self.build_context()
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        for title, templates in profiles.items():
+            with override_settings(TEMPLATES=templates, CACHES=DUMMY_CACHES):
+                # Первый рендер прогревает кэш, как это делает warm_templates.
+                get_template("blog/index.html").render(context, request)
+                started = perf_counter()
+                for _ in range(options["repeat"]):
+                    get_template("blog/index.html").render(context, request)
+                elapsed = (perf_counter() - started) / options["repeat"]
+            self.stdout.write(f"{title}: {elapsed * 1000:.2f} мс на рендер")
+
+    def build_context(self):
+        """Страница из NUM_PUB_PAGE постов, собранных без базы данных."""
+        now = timezone.now()
+        author = User(pk=1, username="author")
+        category = Category(
+            pk=1, slug="travel", title="Путешествия", is_published=True
+        )
+        location = Location(pk=1, name="Остров", is_published=True)
+        posts = [
+            Post(
+                pk=number,
+                title=f"Пост {number}",
+                text="Текст публикации " * 50,
+                pub_date=now,
+                updated_at=now,
+                author=author,
+                category=category,
+                location=location,
+            )
+            for number in range(1, NUM_PUB_PAGE + 1)
+        ]
+        page = Paginator(posts, NUM_PUB_PAGE).page(1)
+        return {"page_obj": page, "paginator": page.paginator}
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import build_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Готовит уменьшенные копии изображений постов, у которых их нет."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Пересоздать копии для всех постов с изображением.",
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["all"]:
+            posts = posts.filter(image_variants={})
+        built = 0
+        for post_id in posts.values_list("pk", flat=True).iterator():
+            build_variants(post_id)
+            built += 1
+        self.stdout.write(self.style.SUCCESS(f"Обработано постов: {built}"))
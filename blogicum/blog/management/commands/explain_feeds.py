@@ -0,0 +1,73 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from blog.constants import NUM_PUB_PAGE
+from blog.models import Category, Post, User
+from blog.secondary_func import querying_posts
+
+
+class RollbackIndexes(Exception):
+    """Откат транзакции, в которой были удалены индексы."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Показывает планы и время выполнения запросов лент "
+        "с индексами Post и без них."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Сколько раз выполнять каждый запрос для замера времени.",
+        )
+
+    def handle(self, *args, **options):
+        category = Category.objects.filter(is_published=True).first()
+        author = User.objects.filter(posts__isnull=False).first()
+        if category is None or author is None:
+            raise CommandError(
+                "Нужна хотя бы одна опубликованная категория и автор с "
+                "публикациями; загрузите данные перед запуском."
+            )
+        feeds = {
+            "index": lambda: querying_posts(),
+            "category": lambda: querying_posts(category=category),
+            "profile": lambda: (
+                Post.objects.filter(author=author).order_by("-pub_date")
+            ),
+        }
+        self.stdout.write(f"База данных: {connection.vendor}")
+        try:
+            with transaction.atomic():
+                self.drop_indexes()
+                self.report("без индексов", feeds, options["repeat"])
+                raise RollbackIndexes
+        except RollbackIndexes:
+            pass
+        # Новое соединение сбрасывает кэш подготовленных выражений SQLite,
+        # иначе планы запросов останутся от удалённых индексов.
+        connection.close()
+        self.report("с индексами", feeds, options["repeat"])
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for index in Post._meta.indexes:
+                cursor.execute(
+                    f"DROP INDEX {connection.ops.quote_name(index.name)}"
+                )
+
+    def report(self, title, feeds, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Планы {title}:"))
+        for name, get_queryset in feeds.items():
+            queryset = get_queryset()[:NUM_PUB_PAGE]
+            started = perf_counter()
+            for _ in range(repeat):
+                list(get_queryset()[:NUM_PUB_PAGE])
+            elapsed = (perf_counter() - started) / repeat * 1000
+            self.stdout.write(f"{name}: {elapsed:.2f} мс на запрос")
+            self.stdout.write(queryset.explain())
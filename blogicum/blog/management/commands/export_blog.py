@@ -0,0 +1,60 @@
+from time import perf_counter
+
+from django.core import serializers
+from django.core.management.base import BaseCommand
+
+from blog.dump import dump_models, open_dump
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает пользователей и данные блога в JSON Lines потоком, "
+        "не загружая таблицы в память. Загрузка — import_blog."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл .jsonl или .jsonl.gz.")
+        parser.add_argument("--batch", type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        serializer = serializers.get_serializer("jsonl")
+        started = perf_counter()
+        total = 0
+        with open_dump(options["path"], "w") as stream:
+            for model in dump_models():
+                model_started = perf_counter()
+                counter = _Counter(
+                    model._default_manager.order_by("pk").iterator(
+                        chunk_size=options["batch"]
+                    )
+                )
+                serializer().serialize(counter, stream=stream)
+                self.report(model, counter.count, model_started)
+                total += counter.count
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Выгружено строк: {total} за {elapsed:.1f} с "
+                f"({total / max(elapsed, 1e-9):.0f} строк/с)"
+            )
+        )
+
+    def report(self, model, count, started):
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            f"{model._meta.label_lower}: {count} "
+            f"({count / max(elapsed, 1e-9):.0f} строк/с)"
+        )
+
+
+class _Counter:
+    """Итератор, который считает прошедшие через него объекты."""
+
+    def __init__(self, iterable):
+        self.iterable = iterable
+        self.count = 0
+
+    def __iter__(self):
+        for item in self.iterable:
+            self.count += 1
+            yield item
@@ -0,0 +1,215 @@
+import random
+from datetime import timedelta
+from time import perf_counter
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.cache import FEEDS_TAG, bump_tags
+from blog.models import Category, Comment, Location, Post, User
+from blog.stats import rebuild_stats
+from blog.synthetic import TextGenerator
+
+# Пароль всех сгенерированных пользователей, чтобы под ними можно было
+# войти при нагрузочном замере.
+PASSWORD = "generated-password"
+USERNAME_PREFIX = "gen_user_"
+CATEGORY_SLUG_PREFIX = "gen-category-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу синтетическими пользователями, категориями, "
+        "местоположениями, постами и комментариями через bulk_create. "
+        "Денормализованные поля (comment_count, is_live) заполняются "
+        "сразу, а сводки активности пересчитываются в конце, потому что "
+        "сигналы при массовой вставке не срабатывают."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument("--locations", type=int, default=500)
+        parser.add_argument("--posts", type=int, default=1_000_000)
+        parser.add_argument(
+            "--comments-per-post",
+            type=float,
+            default=3,
+            help="Среднее число комментариев к посту.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=3 * 365,
+            help="За сколько дней назад разбросать даты публикаций.",
+        )
+        parser.add_argument("--batch", type=int, default=5_000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.text = TextGenerator(options["seed"])
+        self.batch = options["batch"]
+        self.now = timezone.now()
+        started = perf_counter()
+        with transaction.atomic():
+            users = self.create_users(options["users"])
+            categories = self.create_categories(options["categories"])
+            locations = self.create_locations(options["locations"])
+        # Без новых объектов посты раздаются существующим.
+        users = users or list(User.objects.values_list("id", flat=True))
+        categories = categories or list(
+            Category.objects.values_list("id", flat=True)
+        )
+        if options["posts"] and not (users and categories):
+            raise CommandError(
+                "Для постов нужны пользователи и категории: задайте "
+                "--users и --categories больше нуля."
+            )
+        comments = self.create_posts(
+            options["posts"],
+            options["comments_per_post"],
+            options["days"],
+            users,
+            categories,
+            locations,
+        )
+        # Массовая вставка обошла сигналы: пересчитываем сводки
+        # и сбрасываем все ленты разом.
+        rebuild_stats(self.batch)
+        bump_tags(FEEDS_TAG)
+        self.stdout.write(
+            f"Пользователей: {len(users)}, категорий: {len(categories)}, "
+            f"местоположений: {len(locations)}, постов: {options['posts']}, "
+            f"комментариев: {comments} за "
+            f"{perf_counter() - started:.1f} с"
+        )
+
+    def new_ids(self, model, create):
+        """Создаёт объекты и возвращает их id по порядку вставки.
+
+        bulk_create на SQLite не возвращает id, поэтому они читаются
+        из базы: всё, что выше прежнего максимума.
+        """
+        last_id = model.objects.aggregate(last=Max("id"))["last"] or 0
+        create()
+        return list(
+            model.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    def create_users(self, total):
+        password = make_password(PASSWORD)
+        start = User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).count()
+        return self.new_ids(
+            User,
+            lambda: User.objects.bulk_create(
+                (
+                    User(
+                        username=f"{USERNAME_PREFIX}{start + number}",
+                        password=password,
+                    )
+                    for number in range(total)
+                ),
+                batch_size=self.batch,
+            ),
+        )
+
+    def create_categories(self, total):
+        start = Category.objects.filter(
+            slug__startswith=CATEGORY_SLUG_PREFIX
+        ).count()
+        return self.new_ids(
+            Category,
+            lambda: Category.objects.bulk_create(
+                Category(
+                    title=self.text.sentence(2).capitalize(),
+                    description=self.text.sentence(12),
+                    slug=f"{CATEGORY_SLUG_PREFIX}{start + number}",
+                    # Каждая двадцатая категория снята с публикации.
+                    is_published=number % 20 != 19,
+                )
+                for number in range(total)
+            ),
+        )
+
+    def create_locations(self, total):
+        return self.new_ids(
+            Location,
+            lambda: Location.objects.bulk_create(
+                Location(name=self.text.sentence(1).capitalize())
+                for _ in range(total)
+            ),
+        )
+
+    def create_posts(
+        self, total, comments_per_post, days, users, categories, locations
+    ):
+        created_comments = 0
+        for offset in range(0, total, self.batch):
+            size = min(self.batch, total - offset)
+            # Число комментариев по геометрическому распределению:
+            # у большинства постов их мало, у немногих — много.
+            counts = [
+                int(self.random.expovariate(1 / comments_per_post))
+                if comments_per_post
+                else 0
+                for _ in range(size)
+            ]
+            posts = [
+                self.build_post(count, days, users, categories, locations)
+                for count in counts
+            ]
+            with transaction.atomic():
+                post_ids = self.new_ids(
+                    Post, lambda: Post.objects.bulk_create(posts)
+                )
+                Comment.objects.bulk_create(
+                    (
+                        Comment(
+                            text=self.text.sentence(
+                                self.random.randint(3, 30)
+                            ),
+                            author_id=self.random.choice(users),
+                            post_id=post_id,
+                        )
+                        for post_id, count in zip(post_ids, counts)
+                        for _ in range(count)
+                    ),
+                    batch_size=self.batch,
+                )
+            created_comments += sum(counts)
+            self.stdout.write(f"постов: {offset + size}/{total}")
+        return created_comments
+
+    def build_post(self, comment_count, days, users, categories, locations):
+        pub_date = self.now - timedelta(
+            seconds=self.random.uniform(0, days * 24 * 3600)
+        )
+        # Около 1% постов отложено, около 2% снято с публикации.
+        if self.random.random() < 0.01:
+            pub_date = self.now + timedelta(
+                seconds=self.random.uniform(60, 30 * 24 * 3600)
+            )
+        is_published = self.random.random() >= 0.02
+        return Post(
+            title=self.text.sentence(self.random.randint(2, 8)).capitalize(),
+            text=self.text.sentence(self.random.randint(20, 300)),
+            pub_date=pub_date,
+            author_id=self.random.choice(users),
+            category_id=self.random.choice(categories),
+            location_id=(
+                self.random.choice(locations)
+                if locations and self.random.random() < 0.7
+                else None
+            ),
+            is_published=is_published,
+            is_live=is_published and pub_date <= self.now,
+            comment_count=comment_count,
+        )
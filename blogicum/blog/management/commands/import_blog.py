@@ -0,0 +1,110 @@
+from collections import Counter
+from time import perf_counter
+
+from django.core import serializers
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from blog.dump import (
+    dump_models,
+    open_dump,
+    preserve_timestamps,
+    reconcile_posts,
+)
+from blog.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает выгрузку export_blog (JSON Lines) потоком: объекты "
+        "вставляются через bulk_create пачками, родительские модели "
+        "раньше дочерних, без сигналов на каждую строку. После загрузки "
+        "пересчитываются денормализованные поля постов и сводки активности, "
+        "сбрасывается кэш."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл .jsonl или .jsonl.gz.")
+        parser.add_argument("--batch", type=int, default=5_000)
+        parser.add_argument(
+            "--ignore-conflicts",
+            action="store_true",
+            help="Пропускать строки, которые уже есть в базе.",
+        )
+
+    def handle(self, *args, **options):
+        self.models = dump_models()
+        self.buffers = {model: [] for model in self.models}
+        self.counts = Counter()
+        self.ignore_conflicts = options["ignore_conflicts"]
+        batch = options["batch"]
+        m2m = []
+        started = perf_counter()
+        with open_dump(options["path"], "r") as stream, preserve_timestamps(
+            self.models
+        ):
+            for item in serializers.deserialize("jsonl", stream):
+                model = type(item.object)
+                if model not in self.buffers:
+                    raise CommandError(
+                        f"Модель {model._meta.label} не входит в выгрузку "
+                        "блога."
+                    )
+                self.buffers[model].append(item.object)
+                if any(item.m2m_data.values()):
+                    m2m.append(item)
+                if len(self.buffers[model]) >= batch:
+                    self.flush(model)
+            for model in self.models:
+                self.flush(model)
+        with transaction.atomic():
+            for item in m2m:
+                for name, values in item.m2m_data.items():
+                    getattr(item.object, name).set(values)
+            self.reset_sequences()
+            reconcile_posts()
+            rebuild_stats(batch)
+        # Загруженные данные заменили то, что было закэшировано.
+        cache.clear()
+        elapsed = perf_counter() - started
+        total = sum(self.counts.values())
+        for model in self.models:
+            self.stdout.write(
+                f"{model._meta.label_lower}: {self.counts[model]}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Загружено строк: {total} за {elapsed:.1f} с "
+                f"({total / max(elapsed, 1e-9):.0f} строк/с)"
+            )
+        )
+
+    def flush(self, model):
+        """Вставляет накопленные объекты модели; сначала — объекты
+        моделей, на которые она может ссылаться."""
+        for parent in self.models[:self.models.index(model)]:
+            self._insert(parent)
+        self._insert(model)
+
+    def _insert(self, model):
+        objects = self.buffers[model]
+        if not objects:
+            return
+        with transaction.atomic():
+            model._default_manager.bulk_create(
+                objects, ignore_conflicts=self.ignore_conflicts
+            )
+        self.counts[model] += len(objects)
+        self.buffers[model] = []
+
+    def reset_sequences(self):
+        # Первичные ключи пришли из выгрузки, счётчики автоинкремента
+        # PostgreSQL нужно сдвинуть за них.
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), self.models
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
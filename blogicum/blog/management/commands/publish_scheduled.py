@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from blog.constants import SCHEDULER_INTERVAL
+from blog.scheduler import next_scheduled_date, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        "Переводит в ленты отложенные посты, дата публикации которых "
+        "наступила. Запускайте из cron раз в минуту или постоянным "
+        "процессом с --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Не завершаться, а проверять очередь постоянно.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=SCHEDULER_INTERVAL,
+            help="Наибольшая пауза между проверками в секундах.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            published = publish_due_posts()
+            if published:
+                self.stdout.write(f"Опубликовано постов: {published}")
+            if not options["loop"]:
+                return
+            time.sleep(self.pause(options["interval"]))
+
+    @staticmethod
+    def pause(interval):
+        # Просыпаемся к ближайшей публикации, если она раньше интервала.
+        next_date = next_scheduled_date()
+        if next_date is None:
+            return interval
+        until = (next_date - timezone.now()).total_seconds()
+        return min(interval, max(until, 0))
@@ -0,0 +1,27 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from blog.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает сводки активности авторов, категорий "
+        "и местоположений по постам и комментариям. Нужен после "
+        "массовых вставок, которые обходят сигналы."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=1_000)
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        totals = rebuild_stats(options["batch"])
+        for model, total in totals.items():
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {total}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Сводки пересчитаны за {perf_counter() - started:.1f} с"
+            )
+        )
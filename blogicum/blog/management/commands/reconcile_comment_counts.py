@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from blog.models import Post
+from blog.secondary_func import actual_comment_count
+
+
+class Command(BaseCommand):
+    help = "Сверяет Post.comment_count с фактическим числом комментариев."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать расхождения, ничего не исправляя.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = list(
+                Post.objects.select_for_update()
+                .annotate(actual=actual_comment_count())
+                .exclude(comment_count=F("actual"))
+                .values_list("pk", "comment_count", "actual")
+            )
+            for pk, stored, actual in drifted:
+                self.stdout.write(f"Пост {pk}: {stored} -> {actual}")
+            if drifted and not options["dry_run"]:
+                Post.objects.filter(
+                    pk__in=[pk for pk, _, _ in drifted]
+                ).update(comment_count=actual_comment_count())
+        self.stdout.write(
+            self.style.SUCCESS(f"Расхождений найдено: {len(drifted)}")
+        )
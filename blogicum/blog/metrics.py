@@ -0,0 +1,99 @@
+"""Счётчики блога в памяти процесса.
+
+Значения копятся в каждом процессе отдельно; сборщик Prometheus
+опрашивает каждый процесс (или воркер) по эндпоинту metrics.
+"""
+import threading
+from collections import Counter
+
+PREFIX = "blogicum_"
+
+_lock = threading.Lock()
+_counters = Counter()
+# Счётчики представлений: ключ — (имя счётчика, имя представления).
+_view_counters = Counter()
+# Попадания и промахи LRU справочников (blog.lookups): ключ —
+# (имя счётчика, имя справочника).
+_lookup_counters = Counter()
+
+
+def increment(name, value=1):
+    with _lock:
+        _counters[name] += value
+
+
+def observe_view(view, **values):
+    """Прибавляет значения к счётчикам представления view."""
+    with _lock:
+        for name, value in values.items():
+            _view_counters[name, view] += value
+
+
+def observe_lookup(name, hits=0, misses=0):
+    with _lock:
+        _lookup_counters["lookup_hits_total", name] += hits
+        _lookup_counters["lookup_misses_total", name] += misses
+
+
+def snapshot():
+    """Копия всех счётчиков на текущий момент."""
+    with _lock:
+        return dict(_counters)
+
+
+def view_snapshot():
+    """Копия счётчиков представлений: {(счётчик, представление): ...}."""
+    with _lock:
+        return dict(_view_counters)
+
+
+def lookup_snapshot():
+    """Копия счётчиков справочников: {(счётчик, справочник): ...}."""
+    with _lock:
+        return dict(_lookup_counters)
+
+
+def lookup_hit_rate(name):
+    """Доля попаданий в LRU справочника name или None без обращений."""
+    counters = lookup_snapshot()
+    hits = counters.get(("lookup_hits_total", name), 0)
+    total = hits + counters.get(("lookup_misses_total", name), 0)
+    return hits / total if total else None
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _view_counters.clear()
+        _lookup_counters.clear()
+
+
+def _label(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def render_prometheus():
+    """Счётчики в текстовом формате Prometheus."""
+    counters = snapshot()
+    lines = []
+    for name in sorted(counters):
+        lines.append(f"# TYPE {PREFIX}{name} counter")
+        lines.append(f"{PREFIX}{name} {counters[name]}")
+    for label, labelled in (
+        ("view", view_snapshot()),
+        ("lookup", lookup_snapshot()),
+    ):
+        for name in sorted({name for name, _ in labelled}):
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            for (series, value_label), value in sorted(labelled.items()):
+                if series == name:
+                    lines.append(
+                        f'{PREFIX}{name}{{{label}="{_label(value_label)}"}}'
+                        f" {value}"
+                    )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+
+from blog import metrics
+
+logger = logging.getLogger(__name__)
+
+# Счётчик запросов текущего представления. Переменная контекста, а не
+# обёртка соединения: асинхронные представления ходят в базу из потоков
+# пула, и контекст переходит туда вместе с запросом.
+_recorder = ContextVar("query_recorder", default=None)
+
+
+class QueryRecorder:
+    """Обёртка выполнения SQL: число запросов, время и повторы."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка выполнения SQL для каждого соединения (см. blog.signals):
+    передаёт запрос счётчику текущего представления, если он есть."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+class ViewMetricsMiddleware:
+    """Счётчики каждого представления для эндпоинта metrics.
+
+    Записывает число SQL-запросов, время в базе, время рендера шаблона,
+    полное время и размер ответа. Если представление превысило
+    QUERY_BUDGET запросов, пишет предупреждение с самым частым
+    запросом — обычно это и есть N+1. Работает и в синхронной,
+    и в асинхронной цепочке.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django узнаёт асинхронный слой, как в MiddlewareMixin.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        request._render_seconds = 0.0
+        started = perf_counter()
+        token = _recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.observe(request, response, recorder, perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        request._render_seconds = 0.0
+        started = perf_counter()
+        token = _recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.observe(request, response, recorder, perf_counter() - started)
+        return response
+
+    def observe(self, request, response, recorder, elapsed):
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        values = {
+            "view_requests_total": 1,
+            "view_seconds_total": elapsed,
+            "view_queries_total": recorder.count,
+            "view_db_seconds_total": recorder.seconds,
+            "view_render_seconds_total": request._render_seconds,
+        }
+        if not response.streaming:
+            values["view_response_bytes_total"] = len(response.content)
+        budget = getattr(settings, "QUERY_BUDGET", None)
+        if budget is not None and recorder.count > budget:
+            values["view_query_budget_exceeded_total"] = 1
+            sql, repeats = recorder.statements.most_common(1)[0]
+            logger.warning(
+                "%s: %d SQL-запросов при бюджете %d; "
+                "чаще всего (%d раз): %s",
+                view,
+                recorder.count,
+                budget,
+                repeats,
+                sql,
+            )
+        metrics.observe_view(view, **values)
+
+    def process_template_response(self, request, response):
+        if response.is_rendered:
+            # Асинхронные представления рендерят ответ сами и время
+            # рендера записывают сами (blog.async_views.render_view).
+            return response
+        started = perf_counter()
+
+        def rendered(response):
+            request._render_seconds = perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0007_remove_post_comment_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["-pub_date", "-id"],
+                name="post_published_pub_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["category", "-pub_date", "-id"],
+                name="post_category_pub_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "-pub_date", "-id"],
+                name="post_author_pub_date_idx",
+            ),
+        ),
+    ]
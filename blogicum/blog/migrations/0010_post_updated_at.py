@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-18 21:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0009_post_comment_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name="Изменено",
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0010_post_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="image_variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Уменьшенные копии изображения",
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.16 on 2026-10-18 23:40
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_is_live(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Post.objects.filter(
+        is_published=True, pub_date__lte=timezone.now()
+    ).update(is_live=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0012_comment_post_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="is_live",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="В лентах"
+            ),
+        ),
+        migrations.RunPython(fill_is_live, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="post",
+            name="post_published_pub_date_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="post",
+            name="post_category_pub_date_idx",
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_live", True)),
+                fields=["-pub_date", "-id"],
+                name="post_live_pub_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_live", True)),
+                fields=["category", "-pub_date", "-id"],
+                name="post_live_category_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_live", False), ("is_published", True)),
+                fields=["pub_date"],
+                name="post_scheduled_idx",
+            ),
+        ),
+    ]
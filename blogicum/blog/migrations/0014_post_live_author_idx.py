@@ -0,0 +1,21 @@
+# Generated by Django 3.2.16 on 2026-10-18 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0013_post_is_live"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_live", True)),
+                fields=["author", "-pub_date", "-id"],
+                name="post_live_author_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,180 @@
+# Generated by Django 3.2.16 on 2026-10-19 00:20
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+STATS = (
+    ("AuthorStats", "author"),
+    ("CategoryStats", "category"),
+    ("LocationStats", "location"),
+)
+
+
+def fill_stats(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Comment = apps.get_model("blog", "Comment")
+    for model_name, subject in STATS:
+        rows = defaultdict(dict)
+        for key, total, last in (
+            Post.objects.filter(is_live=True, category__is_published=True)
+            .order_by()
+            .values(subject)
+            .annotate(total=Count("id"), last=Max("pub_date"))
+            .values_list(subject, "total", "last")
+        ):
+            rows[key].update(posts_published=total, last_activity=last)
+        for key, total, last in (
+            Comment.objects.filter(
+                post__is_live=True, post__category__is_published=True
+            )
+            .order_by()
+            .values(f"post__{subject}")
+            .annotate(total=Count("id"), last=Max("created_at"))
+            .values_list(f"post__{subject}", "total", "last")
+        ):
+            previous = rows[key].get("last_activity")
+            rows[key].update(
+                comments_received=total,
+                last_activity=max(last, previous or last),
+            )
+        rows.pop(None, None)
+        model = apps.get_model("blog", model_name)
+        model.objects.bulk_create(
+            model(pk=key, **values) for key, values in rows.items()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("blog", "0014_post_live_author_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthorStats",
+            fields=[
+                (
+                    "posts_published",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Постов в лентах"
+                    ),
+                ),
+                (
+                    "comments_received",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Комментариев к постам"
+                    ),
+                ),
+                (
+                    "last_activity",
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Последняя активность",
+                    ),
+                ),
+                (
+                    "author",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Автор",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "статистика автора",
+                "verbose_name_plural": "Статистика авторов",
+            },
+        ),
+        migrations.CreateModel(
+            name="CategoryStats",
+            fields=[
+                (
+                    "posts_published",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Постов в лентах"
+                    ),
+                ),
+                (
+                    "comments_received",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Комментариев к постам"
+                    ),
+                ),
+                (
+                    "last_activity",
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Последняя активность",
+                    ),
+                ),
+                (
+                    "category",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="blog.category",
+                        verbose_name="Категория",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "статистика категории",
+                "verbose_name_plural": "Статистика категорий",
+            },
+        ),
+        migrations.CreateModel(
+            name="LocationStats",
+            fields=[
+                (
+                    "posts_published",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Постов в лентах"
+                    ),
+                ),
+                (
+                    "comments_received",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Комментариев к постам"
+                    ),
+                ),
+                (
+                    "last_activity",
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Последняя активность",
+                    ),
+                ),
+                (
+                    "location",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="blog.location",
+                        verbose_name="Местоположение",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "статистика местоположения",
+                "verbose_name_plural": "Статистика местоположений",
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,22 @@
+from django.http import Http404
 from django.shortcuts import redirect
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from blog.cache import (
+    FEEDS_TAG,
+    get_cached_response,
+    post_card_tags,
+    set_cached_response,
+)
+from blog.constants import CURSOR_PAGE_THRESHOLD, RESPONSE_CACHE_TIMEOUT
+from blog.paginators import (
+    CursorPaginator,
+    FeedPaginator,
+    InvalidCursor,
+    encode_cursor,
+)
+from blog.uploads import ImageUploadHandler
 
 
 class CommentAuthorMixin(object):
@@ -15,3 +33,125 @@ class AuthorRequiredMixin:
         if self.object.author != request.user:
             return redirect("blog:post_detail", post_id=kwargs["post_id"])
         return super().dispatch(request, *args, **kwargs)
+
+
+class CursorPaginationMixin:
+    """Режим курсора для ListView по параметру ?cursor=.
+
+    Без параметра работает обычная нумерованная пагинация; на глубоких
+    страницах ссылка «вперёд» переводит в режим курсора.
+    """
+
+    cursor_kwarg = "cursor"
+
+    def paginate_queryset(self, queryset, page_size):
+        token = self.request.GET.get(self.cursor_kwarg)
+        if token is None:
+            paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(queryset, page_size)
+            )
+            if page.number >= CURSOR_PAGE_THRESHOLD and page.has_next():
+                page.next_cursor = encode_cursor(page[-1])
+            return paginator, page, object_list, is_paginated
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(token)
+        except InvalidCursor:
+            raise Http404("Неверный курсор")
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class FeedCountMixin:
+    """Кэширует число постов ленты ListView под ключом get_count_key()."""
+
+    paginator_class = FeedPaginator
+
+    def get_count_key(self):
+        # Число постов одно на все страницы ленты, поэтому номер страницы
+        # из строки запроса в ключ не входит.
+        return self.request.path
+
+    def get_count_tags(self):
+        return ()
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            count_key=self.get_count_key(),
+            count_tags=self.get_count_tags(),
+            **kwargs,
+        )
+
+
+class AnonymousCacheMixin:
+    """Кэширует ответы анонимным посетителям по URL страницы.
+
+    Ответ сбрасывается, когда сбрасывается любой из тегов
+    get_cache_tags(): изменения постов, комментариев, категорий
+    и местоположений сбрасывают свои теги в blog.signals.
+    """
+
+    cache_timeout = RESPONSE_CACHE_TIMEOUT
+
+    def get_cache_tags(self, context):
+        return ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != "GET" or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        response = get_cached_response(request)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, "render"):
+            response.add_post_render_callback(self._cache_response)
+        return response
+
+    def _cache_response(self, response):
+        if response.cookies or self.request.META.get("CSRF_COOKIE_USED"):
+            return
+        set_cached_response(
+            self.request,
+            response,
+            self.get_cache_tags(response.context_data),
+            self.cache_timeout,
+        )
+
+
+class FeedCacheMixin(AnonymousCacheMixin):
+    """Кэш страниц лент: теги ленты из get_count_tags() и теги всех
+    постов, попавших на страницу."""
+
+    def get_cache_tags(self, context):
+        tags = {FEEDS_TAG, *self.get_count_tags()}
+        for post in context["page_obj"] or ():
+            tags |= post_card_tags(post)
+        return tags
+
+
+class StreamingUploadMixin:
+    """Загрузка файлов формы через ImageUploadHandler.
+
+    Обработчики загрузки можно заменить только до того, как прочитан
+    request.POST, а это делает CsrfViewMiddleware. Поэтому проверка CSRF
+    перенесена внутрь dispatch, как советует документация Django.
+    Миксин должен стоять первым в списке родителей.
+    """
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return self._csrf_dispatch(request, *args, **kwargs)
+
+    @method_decorator(csrf_protect)
+    def _csrf_dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        for field, message in getattr(
+            self.request, "upload_errors", {}
+        ).items():
+            form.add_error(field, message)
+        return form
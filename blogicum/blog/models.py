@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Q
 from django.urls import reverse
 
 from blog.constants import MAX_LENGTH_STR, TEXT_CHAR_LIMIT
@@ -20,6 +21,14 @@ class PublishedModel(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Загруженные значения нужны сигналам, чтобы понять, что именно
+        # изменилось при сохранении.
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class Location(PublishedModel):
     name = models.CharField(
@@ -62,6 +71,12 @@ class Post(PublishedModel):
     )
     text = models.TextField(verbose_name="Текст")
     image = models.ImageField(upload_to="post_images/", blank=True, null=True)
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Уменьшенные копии изображения",
+    )
     pub_date = models.DateTimeField(
         verbose_name="Дата и время публикации",
         help_text=(
@@ -87,12 +102,65 @@ class Post(PublishedModel):
         null=True,
         verbose_name="Категория",
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество комментариев",
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Изменено")
+    # Опубликован и дата публикации наступила. Поле ставит сигнал при
+    # сохранении, а отложенные посты в срок переводит publish_scheduled,
+    # поэтому условие лент не зависит от текущего времени.
+    is_live = models.BooleanField(
+        default=False, editable=False, verbose_name="В лентах"
+    )
 
     class Meta:
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
         ordering = ["-pub_date"]
         default_related_name = "posts"
+        # Индексы под условия выборки из querying_posts: лента,
+        # страница категории и страница автора для посетителей; затем
+        # все посты автора для его собственной страницы. id замыкает
+        # ключ сортировки для постраничного вывода по курсору.
+        # Последний — очередь отложенных публикаций для
+        # publish_scheduled.
+        indexes = [
+            models.Index(
+                fields=["-pub_date", "-id"],
+                condition=Q(is_live=True),
+                name="post_live_pub_date_idx",
+            ),
+            models.Index(
+                fields=["category", "-pub_date", "-id"],
+                condition=Q(is_live=True),
+                name="post_live_category_idx",
+            ),
+            models.Index(
+                fields=["author", "-pub_date", "-id"],
+                condition=Q(is_live=True),
+                name="post_live_author_idx",
+            ),
+            models.Index(
+                fields=["author", "-pub_date", "-id"],
+                name="post_author_pub_date_idx",
+            ),
+            models.Index(
+                fields=["pub_date"],
+                condition=Q(is_published=True, is_live=False),
+                name="post_scheduled_idx",
+            ),
+        ]
+
+    # Поля, от которых зависит, в какие ленты попадает пост.
+    FEED_FIELDS = (
+        "is_published",
+        "is_live",
+        "pub_date",
+        "author_id",
+        "category_id",
+    )
 
     def __str__(self):
         return self.title[:TEXT_CHAR_LIMIT]
@@ -116,8 +184,97 @@ class Comment(models.Model):
         verbose_name = "Коментарий"
         verbose_name_plural = "Коментарии"
         default_related_name = "comments"
+        indexes = [
+            models.Index(
+                fields=["post", "created_at", "id"],
+                name="comment_post_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return (f'Комментарий автора {self.author.username}'
                 f'к посту "{self.post.title}", '
                 f'текст: {self.text[:TEXT_CHAR_LIMIT]}')
+
+
+class ActivityStats(models.Model):
+    """Сводка активности: строка на автора, категорию или местоположение.
+
+    Учитываются только посты в лентах — с is_live в опубликованной
+    категории — и комментарии к ним. Счётчики обновляются приращениями
+    при записи постов и комментариев (blog.stats) и пересчитываются
+    командой rebuild_stats.
+    """
+
+    # Поле поста, по которому пост относится к строке сводки.
+    SUBJECT_FIELD = None
+
+    posts_published = models.PositiveIntegerField(
+        default=0, verbose_name="Постов в лентах"
+    )
+    comments_received = models.PositiveIntegerField(
+        default=0, verbose_name="Комментариев к постам"
+    )
+    last_activity = models.DateTimeField(
+        null=True, blank=True, verbose_name="Последняя активность"
+    )
+
+    class Meta:
+        abstract = True
+
+
+class AuthorStats(ActivityStats):
+    SUBJECT_FIELD = "author"
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Автор",
+    )
+
+    class Meta:
+        verbose_name = "статистика автора"
+        verbose_name_plural = "Статистика авторов"
+
+    def __str__(self):
+        return str(self.author)
+
+
+class CategoryStats(ActivityStats):
+    SUBJECT_FIELD = "category"
+
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Категория",
+    )
+
+    class Meta:
+        verbose_name = "статистика категории"
+        verbose_name_plural = "Статистика категорий"
+
+    def __str__(self):
+        return str(self.category)
+
+
+class LocationStats(ActivityStats):
+    SUBJECT_FIELD = "location"
+
+    location = models.OneToOneField(
+        Location,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Местоположение",
+    )
+
+    class Meta:
+        verbose_name = "статистика местоположения"
+        verbose_name_plural = "Статистика местоположений"
+
+    def __str__(self):
+        return str(self.location)
@@ -0,0 +1,199 @@
+import json
+
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from blog.cache import FEEDS_TAG, versioned_key
+from blog.constants import (
+    COMMENTS_PER_PAGE,
+    EXACT_COUNT_LIMIT,
+    FEED_COUNT_TIMEOUT,
+)
+
+
+class InvalidCursor(Exception):
+    """Курсор повреждён или подделан."""
+
+
+def encode_cursor(obj, reverse=False, field="pub_date"):
+    """Кодирует позицию объекта в непрозрачный токен для ?cursor=.
+
+    Принимает и объект модели, и строку запроса .values().
+    """
+    if isinstance(obj, dict):
+        value, pk = obj[field], obj["id"]
+    else:
+        value, pk = getattr(obj, field), obj.pk
+    payload = [value.isoformat(), pk, int(reverse)]
+    return urlsafe_base64_encode(json.dumps(payload).encode())
+
+
+def decode_cursor(token):
+    """Возвращает (дата, id, reverse) из токена курсора."""
+    try:
+        raw_date, pk, reverse = json.loads(urlsafe_base64_decode(token))
+        date = parse_datetime(raw_date)
+    except (ValueError, TypeError):
+        raise InvalidCursor(token)
+    if date is None or not isinstance(pk, int):
+        raise InvalidCursor(token)
+    return date, pk, bool(reverse)
+
+
+def comments_page(comments, token=None, per_page=COMMENTS_PER_PAGE):
+    """Очередная порция комментариев по ключу (created_at, id).
+
+    Возвращает список комментариев и токен следующей порции
+    (None, если комментариев больше нет).
+    """
+    if token:
+        created_at, pk, _ = decode_cursor(token)
+        comments = comments.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+        )
+    rows = list(comments.order_by("created_at", "id")[:per_page + 1])
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    return rows, encode_cursor(rows[-1], field="created_at")
+
+
+class CursorPage:
+    """Страница постов, полученная по курсору.
+
+    Повторяет ту часть интерфейса django.core.paginator.Page,
+    которой пользуются шаблоны и ListView.
+    """
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return encode_cursor(self.object_list[0], reverse=True)
+        return None
+
+
+class CursorPaginator:
+    """Постраничный вывод по ключу (pub_date, id) без OFFSET и COUNT.
+
+    Стоимость любой страницы одинакова: запрос начинается с позиции
+    курсора в индексе и читает per_page + 1 строк.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = per_page
+
+    def page(self, token):
+        queryset = self.object_list
+        if not token:
+            return self._forward(queryset, has_previous=False)
+        pub_date, pk, reverse = decode_cursor(token)
+        if reverse:
+            queryset = queryset.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+            )
+            rows = list(
+                queryset.order_by("pub_date", "id")[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return CursorPage(rows, self, True, has_previous)
+        queryset = queryset.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+        )
+        return self._forward(queryset, has_previous=True)
+
+    def _forward(self, queryset, has_previous):
+        rows = list(queryset.order_by("-pub_date", "-id")[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return CursorPage(rows[:self.per_page], self, has_next, has_previous)
+
+
+def estimate_count(queryset):
+    """Оценка числа строк запроса по плану PostgreSQL.
+
+    Для остальных СУБД оценки нет, возвращает None.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class WindowedPage(Page):
+    """Страница, которая выводит не все номера страниц, а окно вокруг
+    текущей с многоточиями."""
+
+    @property
+    def page_range(self):
+        return self.paginator.get_elided_page_range(
+            self.number, on_each_side=2, on_ends=1
+        )
+
+
+class FeedPaginator(Paginator):
+    """Пагинатор лент с кэшированным числом постов.
+
+    Число хранится в кэше под ключом ленты (count_key) и сбрасывается
+    через теги при публикации и снятии постов с публикации. На больших
+    таблицах PostgreSQL вместо COUNT(*) используется оценка планировщика.
+    """
+
+    def __init__(self, *args, count_key=None, count_tags=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_key = count_key
+        self.count_tags = (FEEDS_TAG, *count_tags)
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return self._count()
+        key = versioned_key(f"count:{self.count_key}", self.count_tags)
+        count = cache.get(key)
+        if count is None:
+            count = self._count()
+            cache.set(key, count, FEED_COUNT_TIMEOUT)
+        return count
+
+    def _count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+            return estimate
+        return self.object_list.count()
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
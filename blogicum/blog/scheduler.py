@@ -0,0 +1,39 @@
+"""Перевод отложенных публикаций в ленты."""
+from django.utils import timezone
+
+from blog.models import Post
+
+
+def due_posts():
+    """Опубликованные посты, дата публикации которых наступила,
+    но которые ещё не в лентах."""
+    return Post.objects.filter(
+        is_published=True, is_live=False, pub_date__lte=timezone.now()
+    )
+
+
+def publish_due_posts():
+    """Переводит наступившие отложенные посты в ленты.
+
+    Посты сохраняются по одному, поэтому срабатывают те же сигналы,
+    что и при обычной публикации: сброс кэша лент, счётчиков и
+    карточек. Возвращает число переведённых постов.
+    """
+    published = 0
+    for post in due_posts().order_by("pub_date"):
+        post.save(update_fields=["is_live"])
+        published += post.is_live
+    return published
+
+
+def next_scheduled_date():
+    """Дата ближайшей предстоящей публикации или None."""
+    post = (
+        Post.objects.filter(
+            is_published=True, is_live=False, pub_date__gt=timezone.now()
+        )
+        .order_by("pub_date")
+        .only("pub_date")
+        .first()
+    )
+    return post and post.pub_date
@@ -0,0 +1,188 @@
+"""Полнотекстовый поиск по постам.
+
+На SQLite поиск идёт по виртуальной таблице FTS5 blog_post_fts,
+которую триггеры синхронизируют с blog_post. На PostgreSQL
+используется встроенный полнотекстовый поиск со словарём russian,
+на остальных СУБД — поиск подстроки без ранжирования.
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q, TextField, Value
+
+from blog.constants import MAX_SEARCH_TERMS
+from blog.secondary_func import querying_posts
+
+# Границы совпадения во фрагменте. Фрагмент экранируется целиком,
+# а затем эти символы заменяются на <mark>.
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+
+# Окончания, которые отрезаются от слов запроса: FTS5 не умеет
+# стемминг русского языка, поэтому основа ищется по префиксу.
+RUSSIAN_ENDINGS = sorted(
+    (
+        "иями ями ами ого его ому ему ыми ими ией ия ие ий ый ой ей ая яя "
+        "ое ее ые ов ев ах ях ам ям ом ем ию ью а я о е ы и у ю ь й"
+    ).split(),
+    key=len,
+    reverse=True,
+)
+MIN_STEM_LENGTH = 3
+
+FTS_TABLE = "blog_post_fts"
+FTS_SCHEMA = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, text,
+        content='blog_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON blog_post
+    BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON blog_post
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF title, text ON blog_post
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+)
+
+
+def install_search_index(connection):
+    """Создаёт индекс FTS5 и триггеры, если их нет.
+
+    SQLite пересоздаёт таблицу при изменении её схемы в миграциях, и
+    триггеры пропадают вместе со старой таблицей, поэтому установка
+    повторяется после каждого migrate. Если триггеров не было, индекс
+    перестраивается по текущим постам.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master "
+            "WHERE type = 'trigger' AND tbl_name = 'blog_post' "
+            "AND name LIKE %s",
+            [f"{FTS_TABLE}_%"],
+        )
+        complete = cursor.fetchone()[0] == len(FTS_SCHEMA) - 1
+        for statement in FTS_SCHEMA:
+            cursor.execute(statement)
+        if not complete:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+            )
+
+
+def stem(word):
+    """Грубая основа русского слова: без падежного окончания."""
+    for ending in RUSSIAN_ENDINGS:
+        if (
+            word.endswith(ending)
+            and len(word) - len(ending) >= MIN_STEM_LENGTH
+        ):
+            return word[:-len(ending)]
+    return word
+
+
+def search_terms(query):
+    """Основы слов запроса без операторов и знаков препинания."""
+    words = re.findall(r"\w+", query.lower())
+    return [stem(word) for word in words][:MAX_SEARCH_TERMS]
+
+
+def search_posts(query):
+    """Опубликованные посты по запросу, лучшие совпадения первыми.
+
+    Посты получают аннотации search_rank (больше — лучше) и
+    search_snippet — фрагмент текста с совпадениями, размеченными
+    SNIPPET_START и SNIPPET_END (или None, если СУБД их не строит).
+    """
+    posts = querying_posts()
+    terms = search_terms(query)
+    if not terms:
+        return posts.none()
+    vendor = connections[posts.db].vendor
+    if vendor == "sqlite":
+        return _sqlite_search(posts, terms)
+    if vendor == "postgresql":
+        return _postgres_search(posts, query)
+    return _substring_search(posts, terms)
+
+
+def _sqlite_search(posts, terms):
+    # Каждая основа — префиксный запрос в кавычках: пользовательский
+    # ввод не попадает в синтаксис MATCH.
+    match = " ".join(f'"{term}"*' for term in terms)
+    return posts.extra(
+        tables=[FTS_TABLE],
+        where=[f"{FTS_TABLE}.rowid = blog_post.id", f"{FTS_TABLE} MATCH %s"],
+        params=[match],
+        # Заголовок весит больше текста; bm25 тем меньше, чем лучше.
+        select={
+            "search_rank": f"-bm25({FTS_TABLE}, 10.0, 1.0)",
+            "search_snippet": f"snippet({FTS_TABLE}, -1, %s, %s, %s, 16)",
+        },
+        select_params=[SNIPPET_START, SNIPPET_END, "…"],
+    ).order_by("-search_rank", "-pub_date", "-id")
+
+
+def _postgres_search(posts, query):
+    from django.contrib.postgres.search import (
+        SearchHeadline,
+        SearchQuery,
+        SearchRank,
+        SearchVector,
+    )
+
+    vector = SearchVector("title", weight="A", config="russian")
+    vector += SearchVector("text", weight="B", config="russian")
+    search_query = SearchQuery(
+        query, config="russian", search_type="websearch"
+    )
+    return (
+        posts.annotate(search=vector)
+        .filter(search=search_query)
+        .annotate(
+            search_rank=SearchRank(vector, search_query),
+            search_snippet=SearchHeadline(
+                "text",
+                search_query,
+                config="russian",
+                start_sel=SNIPPET_START,
+                stop_sel=SNIPPET_END,
+                max_words=16,
+                min_words=8,
+            ),
+        )
+        .order_by("-search_rank", "-pub_date", "-id")
+    )
+
+
+def _substring_search(posts, terms):
+    for term in terms:
+        posts = posts.filter(
+            Q(title__icontains=term) | Q(text__icontains=term)
+        )
+    return posts.annotate(
+        search_rank=Value(0.0, output_field=FloatField()),
+        search_snippet=Value(None, output_field=TextField()),
+    )
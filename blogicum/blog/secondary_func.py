@@ -1,18 +1,98 @@
-from django.db.models import Count
-from django.utils import timezone
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 
-from blog.models import Post
+from blog.cache import FEEDS_TAG, author_tag, stats_tag, versioned_key
+from blog.constants import CATEGORY_STATS_TIMEOUT, PROFILE_STATS_TIMEOUT
+from blog.models import AuthorStats, CategoryStats, Comment, Post
+
+
+def published_posts_filter():
+    """Условие, при котором пост виден всем посетителям.
+
+    Не зависит от текущего времени: отложенные посты попадают в ленты
+    через Post.is_live, который выставляет publish_scheduled.
+    """
+    return Q(is_live=True, category__is_published=True)
 
 
 def querying_posts(**kwargs):
-    """Запрос постов к базе данных."""
-    return (Post.objects.filter(
-        is_published=True,
-        pub_date__lt=timezone.now(),
-        category__is_published=True,
-        **kwargs
+    """Запрос постов к базе данных.
+
+    Категория и место не присоединяются: карточки берут их из LRU
+    процесса (blog.lookups.attach_lookups).
+    """
+    return (
+        Post.objects.filter(published_posts_filter(), **kwargs)
+        .select_related("author")
+        .order_by("-pub_date", "-id")
     )
-        .select_related("author", "category", "location")
-        .annotate(comments_count=Count("comments"))
-        .order_by("-pub_date")
+
+
+def visible_posts(user):
+    """Посты, которые может открыть пользователь: опубликованные
+    и, для авторизованного пользователя, все его собственные."""
+    visible = published_posts_filter()
+    if user.is_authenticated:
+        visible |= Q(author=user)
+    return Post.objects.filter(visible).select_related(
+        "author", "category", "location"
+    )
+
+
+def actual_comment_count():
+    """Подзапрос с фактическим числом комментариев поста."""
+    comments = (
+        Comment.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(comments), 0)
+
+
+def profile_stats(user):
+    """Шапка страницы пользователя: число постов в лентах, дата
+    регистрации и роль.
+
+    Число постов берётся из сводки AuthorStats. Шапка хранится в кэше
+    под тегом автора: его сбрасывают правка профиля и изменения постов
+    автора, влияющие на ленты (blog.signals).
+    """
+    key = versioned_key(
+        f"profile:{user.pk}", (FEEDS_TAG, author_tag(user.pk))
+    )
+    stats = cache.get(key)
+    if stats is None:
+        summary = AuthorStats.objects.filter(pk=user.pk).first()
+        stats = {
+            "posts": summary.posts_published if summary else 0,
+            "date_joined": user.date_joined,
+            "is_staff": user.is_staff,
+        }
+        cache.set(key, stats, PROFILE_STATS_TIMEOUT)
+    return stats
+
+
+def category_stats(category_id):
+    """Сводка категории для шапки её страницы: число постов в лентах
+    и комментариев к ним.
+
+    Хранится в кэше под тегом строки сводки, который сбрасывает каждое
+    её изменение (blog.stats), и под ленточным — его сбрасывает
+    rebuild_stats.
+    """
+    key = versioned_key(
+        f"category-stats:{category_id}",
+        (FEEDS_TAG, stats_tag(CategoryStats, category_id)),
     )
+    stats = cache.get(key)
+    if stats is None:
+        stats = (
+            CategoryStats.objects.filter(pk=category_id)
+            .values("posts_published", "comments_received")
+            .first()
+        ) or {"posts_published": 0, "comments_received": 0}
+        cache.set(key, stats, CATEGORY_STATS_TIMEOUT)
+    return stats
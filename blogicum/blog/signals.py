@@ -0,0 +1,320 @@
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.cache import (
+    FEEDS_TAG,
+    author_tag,
+    bump_tags,
+    category_tag,
+    location_tag,
+    post_feed_tags,
+    post_tag,
+)
+from blog.images import (
+    schedule_variant_cleanup,
+    schedule_variants,
+    stored_image_name,
+)
+from blog.lookups import categories, locations
+from blog.middleware import record_query
+from blog.models import (
+    Category,
+    CategoryStats,
+    Comment,
+    Location,
+    Post,
+    User,
+)
+from blog.search import install_search_index
+from blog.stats import (
+    apply_comment_change,
+    apply_post_change,
+    carries_comments,
+    category_post_subjects,
+    post_state,
+    refresh_category_stats,
+    stored_post_state,
+)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    """Запоминает пост, к которому комментарий относился до сохранения:
+    в админке комментарий можно перенести к другому посту."""
+    instance._post_id_before = None
+    if not instance._state.adding:
+        instance._post_id_before = (
+            Comment.objects.filter(pk=instance.pk)
+            .values_list("post_id", flat=True)
+            .first()
+        )
+
+
+def moved_from(instance, created):
+    """Прежний пост комментария, если сохранение его сменило."""
+    before = None if created else instance._post_id_before
+    return before if before != instance.post_id else None
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    """Увеличивает счётчик комментариев поста при создании комментария.
+
+    При переносе комментария счётчик переходит от прежнего поста
+    к новому.
+    """
+    before = moved_from(instance, created)
+    if before is not None:
+        Post.objects.filter(pk=before, comment_count__gt=0).update(
+            comment_count=F("comment_count") - 1
+        )
+    if (created or before is not None) and instance.post_id is not None:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F("comment_count") + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев поста при удалении комментария.
+
+    Срабатывает и при каскадном удалении комментариев вместе с постом
+    или автором, а также при удалении из админки.
+    """
+    if instance.post_id is not None:
+        Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+            comment_count=F("comment_count") - 1
+        )
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_stats(sender, instance, created, **kwargs):
+    before = moved_from(instance, created)
+    if before is not None:
+        apply_comment_change(before, -1)
+    if (created or before is not None) and instance.post_id is not None:
+        apply_comment_change(instance.post_id, 1, instance.created_at)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment_stats(sender, instance, **kwargs):
+    # При каскадном удалении поста комментарии удаляются раньше него,
+    # так что пост ещё можно найти.
+    if instance.post_id is not None:
+        apply_comment_change(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post(sender, instance, **kwargs):
+    post_ids = {
+        instance.post_id,
+        getattr(instance, "_post_id_before", None),
+    } - {None}
+    if post_ids:
+        bump_tags(*(post_tag(post_id) for post_id in post_ids))
+
+
+@receiver(pre_save, sender=Post)
+def set_post_live(sender, instance, **kwargs):
+    """Пост попадает в ленты сразу, если дата публикации уже наступила;
+    отложенные посты в срок переводит publish_scheduled."""
+    instance.is_live = bool(
+        instance.is_published
+        and instance.pub_date is not None
+        and instance.pub_date <= timezone.now()
+    )
+
+
+@receiver(pre_save, sender=Post)
+def reset_image_variants(sender, instance, **kwargs):
+    """Копии старого изображения не подходят к новому."""
+    before = stored_image_name(instance)
+    instance._image_changed = bool(instance.image) and (
+        not instance.image._committed or before != instance.image.name
+    )
+    # Прежнее изображение, чьи копии больше не нужны.
+    instance._replaced_image = (
+        before if before and before != instance.image.name else None
+    )
+    if instance._image_changed or not instance.image:
+        instance.image_variants = {}
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_stats_state(sender, instance, **kwargs):
+    instance._stats_before = stored_post_state(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_post_stats(sender, instance, **kwargs):
+    """Переносит вклад поста в сводки автора, категории и места."""
+    before = instance._stats_before
+    after = post_state(instance)
+    comments = 0
+    if carries_comments(before, after):
+        comments = Comment.objects.filter(post_id=instance.pk).count()
+    apply_post_change(before, after, comments)
+    instance._stats_state = after
+
+
+@receiver(post_delete, sender=Post)
+def uncount_post_stats(sender, instance, **kwargs):
+    apply_post_change(post_state(instance), None)
+
+
+@receiver(post_save, sender=Post)
+def build_image_variants(sender, instance, **kwargs):
+    if getattr(instance, "_image_changed", False):
+        schedule_variants(instance)
+    if getattr(instance, "_replaced_image", None):
+        schedule_variant_cleanup(instance, instance._replaced_image)
+    # Без загруженных значений invalidate_post_feeds считает прежнее
+    # состояние неизвестным, поэтому словарь заводить нельзя.
+    loaded = getattr(instance, "_loaded_values", None)
+    if loaded is not None:
+        instance._loaded_values = {
+            **loaded, "image": instance.image.name or ""
+        }
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_feeds(sender, instance, created, **kwargs):
+    """Сбрасывает кэш поста и лент, в которых он появился или пропал."""
+    after = {field: getattr(instance, field) for field in Post.FEED_FIELDS}
+    before = getattr(instance, "_loaded_values", None)
+    instance._loaded_values = {**(before or {}), **after}
+    bump_tags(post_tag(instance.pk))
+    if created:
+        bump_tags(*post_feed_tags(after))
+    elif before is None:
+        # Пост сохранён без загрузки из базы: прежнее состояние неизвестно.
+        bump_tags(FEEDS_TAG)
+    elif any(before.get(field) != after[field] for field in after):
+        bump_tags(*post_feed_tags(before, after))
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_feeds(sender, instance, **kwargs):
+    bump_tags(post_tag(instance.pk), *post_feed_tags({
+        "author_id": instance.author_id,
+        "category_id": instance.category_id,
+    }))
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_published(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance._stats_published = None
+        return
+    loaded = getattr(instance, "_loaded_values", {})
+    if "is_published" in loaded:
+        instance._stats_published = loaded["is_published"]
+    else:
+        instance._stats_published = (
+            Category.objects.filter(pk=instance.pk)
+            .values_list("is_published", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Category)
+def recount_category_stats(sender, instance, created, **kwargs):
+    """Скрытая или опубликованная категория уводит свои посты из лент
+    или возвращает их туда — вместе с вкладом в сводки авторов и мест."""
+    before = instance._stats_published
+    if before is not None and before != instance.is_published:
+        categories.invalidate()
+        refresh_category_stats(category_post_subjects(instance.pk))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_posts(sender, instance, **kwargs):
+    # После удаления посты уже без категории и их не найти. Строка
+    # сводки самой категории удаляется каскадом.
+    subjects = category_post_subjects(instance.pk)
+    del subjects[CategoryStats]
+    instance._stats_subjects = subjects
+
+
+@receiver(post_delete, sender=Category)
+def recount_deleted_category_stats(sender, instance, **kwargs):
+    categories.invalidate()
+    refresh_category_stats(instance._stats_subjects)
+
+
+@receiver(post_save, sender=Category)
+def invalidate_category(sender, instance, created, **kwargs):
+    """Сбрасывает страницы категории; все ленты — если она была снята
+    с публикации или опубликована."""
+    categories.invalidate()
+    bump_tags(category_tag(instance.pk))
+    before = getattr(instance, "_loaded_values", None)
+    instance._loaded_values = {
+        **(before or {}), "is_published": instance.is_published
+    }
+    if created:
+        return
+    if before is None or before.get("is_published") != instance.is_published:
+        bump_tags(FEEDS_TAG)
+
+
+@receiver(post_delete, sender=Category)
+def invalidate_deleted_category(sender, instance, **kwargs):
+    # Посты удалённой категории остаются без категории и выпадают из лент.
+    categories.invalidate()
+    bump_tags(FEEDS_TAG, category_tag(instance.pk))
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location(sender, instance, **kwargs):
+    locations.invalidate()
+    bump_tags(location_tag(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_author(sender, instance, **kwargs):
+    """Имя пользователя выводится в карточках постов и на его странице;
+    сам пользователь хранится в кэше для сессий (blog.backends)."""
+    bump_tags(author_tag(instance.pk))
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает новое соединение SQLite прагмами из настроек."""
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """Подключает счётчик SQL ViewMetricsMiddleware к новому соединению.
+
+    Сигнал приходит при каждом переподключении того же DatabaseWrapper,
+    а execute_wrappers между подключениями не очищается.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(post_migrate)
+def install_post_search_index(sender, using, **kwargs):
+    """Восстанавливает индекс полнотекстового поиска после миграций."""
+    if sender.name == "blog":
+        install_search_index(connections[using])
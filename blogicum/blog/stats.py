@@ -0,0 +1,258 @@
+"""Сводки активности авторов, категорий и местоположений.
+
+Строка сводки хранит число постов в лентах, число комментариев к этим
+постам и время последней активности, поэтому шапки страниц и отчёты
+читают одну строку вместо COUNT по таблице постов. Пост в лентах —
+тот, что виден посетителям: is_live и опубликованная категория
+(published_posts_filter). Сигналы (blog.signals) обновляют строки
+приращениями при записи постов и комментариев, а при скрытии,
+публикации или удалении категории пересчитывают задетые строки;
+rebuild_stats пересчитывает всё заново после массовых вставок.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from blog.cache import FEEDS_TAG, bump_tags, stats_tag
+from blog.lookups import categories
+from blog.models import (
+    AuthorStats,
+    CategoryStats,
+    Comment,
+    LocationStats,
+    Post,
+)
+from blog.secondary_func import published_posts_filter
+
+STATS_MODELS = (AuthorStats, CategoryStats, LocationStats)
+
+# Поля поста, от которых зависят сводки.
+POST_STATE_FIELDS = (
+    "is_live",
+    "pub_date",
+    "author_id",
+    "category_id",
+    "location_id",
+)
+
+
+def post_state(instance):
+    return {field: getattr(instance, field) for field in POST_STATE_FIELDS}
+
+
+def stored_post_state(instance):
+    """Состояние поста в базе до сохранения; None для нового поста."""
+    if instance._state.adding:
+        return None
+    # После сохранения состояние запоминает сигнал update_post_stats,
+    # иначе берутся значения, загруженные из базы.
+    saved = getattr(instance, "_stats_state", None)
+    if saved is not None:
+        return saved
+    loaded = getattr(instance, "_loaded_values", {})
+    if all(field in loaded for field in POST_STATE_FIELDS):
+        return {field: loaded[field] for field in POST_STATE_FIELDS}
+    return (
+        Post.objects.filter(pk=instance.pk)
+        .values(*POST_STATE_FIELDS)
+        .first()
+    )
+
+
+def counted(state):
+    """Пост в состоянии state виден в лентах и входит в сводки.
+
+    Публикация категории берётся текущая: при её смене сигнал уже
+    пересчитал задетые строки (refresh_category_stats).
+    """
+    if not (state and state["is_live"] and state["category_id"]):
+        return False
+    category = categories.get(pk=state["category_id"])
+    return category is not None and category.is_published
+
+
+def carries_comments(before, after):
+    """Вместе с постом переносятся его комментарии: пост вошёл в ленты,
+    пропал из них или сменил автора, категорию или местоположение."""
+    if counted(before) != counted(after):
+        return True
+    return counted(before) and any(
+        before[f"{model.SUBJECT_FIELD}_id"]
+        != after[f"{model.SUBJECT_FIELD}_id"]
+        for model in STATS_MODELS
+    )
+
+
+def apply_post_change(before, after, comments=0):
+    """Переносит вклад поста в сводки из состояния before в after.
+
+    None вместо состояния — поста не было или он удалён. comments —
+    число комментариев поста, которые переезжают вместе с ним (см.
+    carries_comments); комментарии удалённого поста вычитают их
+    собственные сигналы.
+    """
+    old_counted = counted(before)
+    new_counted = counted(after)
+    for model in STATS_MODELS:
+        field = f"{model.SUBJECT_FIELD}_id"
+        old = before[field] if before else None
+        new = after[field] if after else None
+        activity = None
+        if new_counted and (not old_counted or old != new):
+            activity = after["pub_date"]
+        if old == new:
+            delta = new_counted - old_counted
+            _change(
+                model,
+                new,
+                posts=delta,
+                comments=delta * comments,
+                activity=activity,
+            )
+            continue
+        _change(
+            model,
+            old,
+            posts=-old_counted,
+            comments=-old_counted * comments,
+        )
+        _change(
+            model,
+            new,
+            posts=new_counted,
+            comments=new_counted * comments,
+            activity=activity,
+        )
+
+
+def apply_comment_change(post_id, delta, activity=None):
+    """Учитывает появление (delta=1) или удаление (delta=-1)
+    комментария к посту post_id, если пост в лентах."""
+    state = (
+        Post.objects.filter(pk=post_id)
+        .values(*POST_STATE_FIELDS)
+        .first()
+    )
+    if not counted(state):
+        return
+    for model in STATS_MODELS:
+        _change(
+            model,
+            state[f"{model.SUBJECT_FIELD}_id"],
+            comments=delta,
+            activity=activity,
+        )
+
+
+def _change(model, key, posts=0, comments=0, activity=None):
+    if key is None:
+        return
+    values = {}
+    rows = model.objects.filter(pk=key)
+    for field, delta in (
+        ("posts_published", posts),
+        ("comments_received", comments),
+    ):
+        if delta:
+            values[field] = F(field) + delta
+        if delta < 0:
+            rows = rows.filter(**{f"{field}__gte": -delta})
+    if activity is not None:
+        values["last_activity"] = Greatest(
+            Coalesce("last_activity", Value(activity)), Value(activity)
+        )
+    if not values:
+        return
+    if rows.update(**values):
+        bump_tags(stats_tag(model, key))
+        return
+    # Строки нет (объект создан массовой вставкой) или счётчик разошёлся
+    # с данными. При вычитании без строки пересчитывать нечего: так
+    # бывает, когда строка удаляется каскадом вместе с объектом.
+    if posts > 0 or comments > 0 or model.objects.filter(pk=key).exists():
+        refresh_stats(model, [key])
+
+
+def aggregate_stats(model, keys=None):
+    """Сводки по данным постов и комментариев: {ключ: поля строки}."""
+    subject = model.SUBJECT_FIELD
+    posts = Post.objects.filter(published_posts_filter())
+    comments = Comment.objects.filter(
+        post__is_live=True, post__category__is_published=True
+    )
+    if keys is not None:
+        posts = posts.filter(**{f"{subject}__in": keys})
+        comments = comments.filter(**{f"post__{subject}__in": keys})
+    rows = defaultdict(
+        lambda: {
+            "posts_published": 0,
+            "comments_received": 0,
+            "last_activity": None,
+        }
+    )
+    for field, queryset, key_field, date_field in (
+        ("posts_published", posts, subject, "pub_date"),
+        ("comments_received", comments, f"post__{subject}", "created_at"),
+    ):
+        for key, total, last in (
+            queryset.order_by()
+            .values(key_field)
+            .annotate(total=Count("id"), last=Max(date_field))
+            .values_list(key_field, "total", "last")
+        ):
+            if key is None:
+                continue
+            row = rows[key]
+            row[field] = total
+            if row["last_activity"] is None or last > row["last_activity"]:
+                row["last_activity"] = last
+    return rows
+
+
+def refresh_stats(model, keys):
+    """Пересчитывает строки сводки model для данных ключей."""
+    rows = aggregate_stats(model, keys)
+    for key in keys:
+        model.objects.update_or_create(pk=key, defaults=rows[key])
+    bump_tags(*(stats_tag(model, key) for key in keys))
+
+
+def category_post_subjects(category_id):
+    """Ключи строк сводок, в которые входят посты категории."""
+    posts = Post.objects.filter(category_id=category_id).order_by()
+    return {
+        model: {category_id}
+        if model is CategoryStats
+        else set(
+            posts.exclude(**{f"{model.SUBJECT_FIELD}_id": None})
+            .values_list(f"{model.SUBJECT_FIELD}_id", flat=True)
+            .distinct()
+        )
+        for model in STATS_MODELS
+    }
+
+
+def refresh_category_stats(subjects):
+    """Пересчитывает строки, собранные category_post_subjects, после
+    скрытия, публикации или удаления категории."""
+    for model, keys in subjects.items():
+        refresh_stats(model, list(keys))
+
+
+def rebuild_stats(batch_size=1_000):
+    """Пересчитывает все сводки; возвращает число строк по моделям."""
+    totals = {}
+    for model in STATS_MODELS:
+        rows = aggregate_stats(model)
+        with transaction.atomic():
+            model.objects.all().delete()
+            model.objects.bulk_create(
+                (model(pk=key, **values) for key, values in rows.items()),
+                batch_size=batch_size,
+            )
+        totals[model] = len(rows)
+    # Закэшированные сводки зависят и от ленточного тега.
+    bump_tags(FEEDS_TAG)
+    return totals
@@ -0,0 +1,42 @@
+"""Синтетический текст для генерации данных и замеров.
+
+Слова складываются из слогов, частоты подчиняются закону Ципфа, как
+в естественном тексте: несколько слов встречаются почти везде, а
+большинство — редко. Это важно для поиска и размера индексов.
+"""
+import random
+from itertools import accumulate
+
+SYLLABLES = (
+    "ба ве го да ко ла ми но пе ра со ту фа ха це чи ша ще ю я".split()
+)
+ENDINGS = ("", "а", "и", "у", "ой", "ами", "ах", "е", "ы", "ом")
+VOCABULARY_SIZE = 20_000
+
+
+class TextGenerator:
+    def __init__(self, seed=0, vocabulary_size=VOCABULARY_SIZE):
+        self.random = random.Random(seed)
+        words = set()
+        while len(words) < vocabulary_size:
+            words.add(
+                "".join(self.random.choices(SYLLABLES, k=3))
+                + self.random.choice("кмнрст")
+            )
+        # Ранг слова в частотном словаре не зависит от алфавита.
+        self.vocabulary = sorted(words, key=lambda word: self.random.random())
+        self.cum_weights = list(
+            accumulate(1 / rank for rank in range(1, vocabulary_size + 1))
+        )
+
+    def word(self, rank):
+        """Основа слова с данным рангом (0 — самое частое)."""
+        return self.vocabulary[rank]
+
+    def sentence(self, length):
+        return " ".join(
+            word + self.random.choice(ENDINGS)
+            for word in self.random.choices(
+                self.vocabulary, cum_weights=self.cum_weights, k=length
+            )
+        )
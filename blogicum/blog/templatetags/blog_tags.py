@@ -0,0 +1,94 @@
+import hashlib
+
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.html import escape, format_html
+from django.utils.safestring import mark_safe
+
+from blog import metrics
+from blog.constants import IMAGE_WIDTHS, POST_CARD_CACHE_TIMEOUT
+from blog.images import variant_name
+from blog.lookups import attach_lookups
+from blog.search import SNIPPET_END, SNIPPET_START
+
+register = template.Library()
+
+
+def post_card_version(post):
+    """Отпечаток всего, что выводится в карточке поста.
+
+    Ключ меняется при правке поста, новом комментарии и при изменении
+    автора, категории или местоположения, поэтому карточку не нужно
+    сбрасывать явно.
+    """
+    category = post.category
+    location = post.location
+    stamp = (
+        post.updated_at,
+        post.comment_count,
+        post.author.username,
+        category and (category.slug, category.title, category.is_published),
+        location and (location.name, location.is_published),
+    )
+    return hashlib.md5(repr(stamp).encode()).hexdigest()
+
+
+@register.simple_tag
+def post_card(post):
+    """Карточка поста из кэша, общая для всех лент."""
+    attach_lookups((post,))
+    key = f"blog:post_card:{post.pk}:{post_card_version(post)}"
+    html = cache.get(key)
+    if html is None:
+        metrics.increment("post_card_cache_misses")
+        html = render_to_string("includes/post_card.html", {"post": post})
+        cache.set(key, html, POST_CARD_CACHE_TIMEOUT)
+    else:
+        metrics.increment("post_card_cache_hits")
+    return mark_safe(html)
+
+
+@register.simple_tag
+def post_image(post, size):
+    """Тег <img> с уменьшенными копиями изображения в srcset.
+
+    size — ключ IMAGE_WIDTHS: «card» для ленты, «detail» для страницы
+    поста. Пока копии не готовы, выводится оригинал.
+    """
+    image = post.image
+    css = "border-3 rounded img-fluid img-thumbnail mb-2 mx-auto d-block"
+    variants = post.image_variants or {}
+    base_width, retina_width = IMAGE_WIDTHS[size]
+    widths = [
+        width for width in variants.get("widths", ())
+        if width in (base_width, retina_width)
+    ]
+    if not widths:
+        return format_html('<img class="{}" src="{}">', css, image.url)
+    sources = [
+        (image.storage.url(variant_name(image.name, width)), width)
+        for width in widths
+    ]
+    if retina_width not in widths:
+        # Оригинал уже меньше retina-копии — он и будет лучшим вариантом.
+        sources.append((image.url, variants["width"]))
+    return format_html(
+        '<img class="{}" src="{}" srcset="{}" '
+        'sizes="(max-width: {}px) 100vw, {}px" loading="lazy">',
+        css,
+        sources[0][0],
+        ", ".join(f"{url} {width}w" for url, width in sources),
+        base_width,
+        base_width,
+    )
+
+
+@register.filter
+def highlight(snippet):
+    """Экранирует фрагмент поиска и выделяет совпадения тегом <mark>."""
+    return mark_safe(
+        escape(snippet)
+        .replace(SNIPPET_START, "<mark>")
+        .replace(SNIPPET_END, "</mark>")
+    )
@@ -0,0 +1,109 @@
+"""Потоковая загрузка изображений постов.
+
+Файл пишется на диск по частям и никогда не собирается в памяти целиком.
+Размер файла и размеры картинки проверяются по ходу загрузки, так что
+слишком большой файл или «бомба распаковки» отбрасываются, не дожидаясь
+конца передачи.
+"""
+import logging
+from io import BytesIO
+from time import perf_counter
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadhandler import (
+    SkipFile,
+    TemporaryFileUploadHandler,
+)
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+from blog import metrics
+from blog.constants import MAX_IMAGE_PIXELS, MAX_IMAGE_UPLOAD_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def check_image_size(width, height):
+    """Отклоняет изображения, которые опасно распаковывать."""
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ValidationError(
+            "Изображение слишком большое: %(width)s×%(height)s пикселей.",
+            code="image_too_large",
+            params={"width": width, "height": height},
+        )
+
+
+def read_image_header(file):
+    """Открывает изображение без декодирования пикселей.
+
+    Pillow читает только заголовок; DecompressionBombError и ошибки
+    формата превращаются в ValidationError. Возвращённое изображение
+    уже закрыто: формат и размеры у него остаются, а временный файл
+    загрузки не держится открытым.
+    """
+    try:
+        with Image.open(file) as image:
+            check_image_size(*image.size)
+    except Image.DecompressionBombError as exc:
+        raise ValidationError(
+            "Изображение слишком большое.", code="image_too_large"
+        ) from exc
+    return image
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл и проверяет её на лету.
+
+    Ошибки складываются в request.upload_errors, а файл пропускается;
+    форма выводит их как ошибки поля (см. StreamingUploadMixin).
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.started = perf_counter()
+        self.received = 0
+        self.header_checked = False
+        self.head = b""
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > MAX_IMAGE_UPLOAD_SIZE:
+            self.reject(
+                "Файл больше %s." % filesizeformat(MAX_IMAGE_UPLOAD_SIZE)
+            )
+        if not self.header_checked:
+            self.check_header(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def check_header(self, raw_data):
+        # Размеры картинки обычно лежат в первых килобайтах файла.
+        self.head += raw_data
+        try:
+            read_image_header(BytesIO(self.head))
+        except ValidationError as error:
+            self.reject(error.messages[0])
+        except Exception:
+            if len(self.head) < self.chunk_size * 4:
+                return
+        self.header_checked = True
+        self.head = b""
+
+    def reject(self, message):
+        errors = getattr(self.request, "upload_errors", {})
+        errors[self.field_name] = message
+        self.request.upload_errors = errors
+        metrics.increment("image_uploads_rejected")
+        raise SkipFile(message)
+
+    def file_complete(self, file_size):
+        elapsed = perf_counter() - self.started
+        metrics.increment("image_uploads")
+        metrics.increment("image_upload_bytes", file_size)
+        metrics.increment("image_upload_seconds", elapsed)
+        logger.debug(
+            "Загружено %s байт за %.3f с (%.1f МБ/с)",
+            file_size,
+            elapsed,
+            file_size / elapsed / 1024 / 1024 if elapsed else 0,
+        )
+        return super().file_complete(file_size)
@@ -1,19 +1,39 @@
+from django.conf import settings
 from django.urls import include, path
 
+from .api import CategoryApiView, PostApiView, PostFeedApiView, ProfileApiView
+from .feeds import (
+    CategoryAtomFeed,
+    CategoryFeed,
+    LatestPostsAtomFeed,
+    LatestPostsFeed,
+)
 from .views import (
     BlogListView,
     CategoryListView,
     CommentCreateView,
     CommentDeleteView,
+    CommentListView,
     CommentUpdateView,
     PostCreateView,
     PostDeleteView,
     PostDetailView,
     PostUpdateView,
+    SearchView,
     UserEditView,
     UserProfileView,
+    metrics_view,
 )
 
+if settings.ASYNC_VIEWS:
+    # Под ASGI ленты и страницы постов обслуживаются асинхронно.
+    from .async_views import (
+        AsyncBlogListView as BlogListView,
+        AsyncCategoryListView as CategoryListView,
+        AsyncPostDetailView as PostDetailView,
+        AsyncUserProfileView as UserProfileView,
+    )
+
 app_name = "blog"
 
 posts_urls = [
@@ -23,6 +43,11 @@ posts_urls = [
     path("<int:post_id>/edit/", PostUpdateView.as_view(), name="edit_post"),
     path("create/", PostCreateView.as_view(), name="create_post"),
     path("<int:post_id>/", PostDetailView.as_view(), name="post_detail"),
+    path(
+        "<int:post_id>/comments/",
+        CommentListView.as_view(),
+        name="post_comments",
+    ),
     path(
         "<int:post_id>/comment/",
         CommentCreateView.as_view(),
@@ -40,6 +65,21 @@ posts_urls = [
     ),
 ]
 
+api_urls = [
+    path("posts/", PostFeedApiView.as_view(), name="api_index"),
+    path("posts/<int:post_id>/", PostApiView.as_view(), name="api_post"),
+    path(
+        "category/<slug:category_slug>/",
+        CategoryApiView.as_view(),
+        name="api_category",
+    ),
+    path(
+        "profile/<str:username>/",
+        ProfileApiView.as_view(),
+        name="api_profile",
+    ),
+]
+
 urlpatterns = [
     path("", BlogListView.as_view(), name="index"),
     path(
@@ -47,7 +87,22 @@ urlpatterns = [
         CategoryListView.as_view(),
         name="category_posts",
     ),
+    path(
+        "category/<slug:category_slug>/rss/",
+        CategoryFeed(),
+        name="category_feed_rss",
+    ),
+    path(
+        "category/<slug:category_slug>/atom/",
+        CategoryAtomFeed(),
+        name="category_feed_atom",
+    ),
+    path("feeds/rss/", LatestPostsFeed(), name="feed_rss"),
+    path("feeds/atom/", LatestPostsAtomFeed(), name="feed_atom"),
+    path("search/", SearchView.as_view(), name="search"),
+    path("metrics/", metrics_view, name="metrics"),
     path("posts/", include(posts_urls)),
+    path("api/", include(api_urls)),
     path(
         "profile/edit/",
         UserEditView.as_view(),
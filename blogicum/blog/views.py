@@ -1,8 +1,9 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count
-from django.http import Http404
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
+from django.utils.crypto import constant_time_compare
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -11,14 +12,41 @@ from django.views.generic import (
     UpdateView,
 )
 
+from blog import metrics
+from blog.cache import (
+    INDEX_TAG,
+    author_tag,
+    category_tag,
+    post_card_tags,
+    post_tag,
+    stats_tag,
+)
 from blog.constants import NUM_PUB_PAGE
 from blog.forms import CommentForm, PostForm
-from blog.mixins import AuthorRequiredMixin, CommentAuthorMixin
-from blog.models import Category, Comment, Post, User
-from blog.secondary_func import querying_posts
+from blog.lookups import published_category
+from blog.mixins import (
+    AnonymousCacheMixin,
+    AuthorRequiredMixin,
+    CommentAuthorMixin,
+    CursorPaginationMixin,
+    FeedCacheMixin,
+    FeedCountMixin,
+    StreamingUploadMixin,
+)
+from blog.models import CategoryStats, Comment, Post, User
+from blog.paginators import InvalidCursor, comments_page
+from blog.search import search_posts
+from blog.secondary_func import (
+    category_stats,
+    profile_stats,
+    querying_posts,
+    visible_posts,
+)
 
 
-class BlogListView(ListView):
+class BlogListView(
+    FeedCacheMixin, CursorPaginationMixin, FeedCountMixin, ListView
+):
     model = Post
     template_name = "blog/index.html"
     paginate_by = NUM_PUB_PAGE
@@ -26,48 +54,106 @@ class BlogListView(ListView):
     def get_queryset(self):
         return querying_posts()
 
+    def get_count_tags(self):
+        return (INDEX_TAG,)
+
+
+class SearchView(ListView):
+    template_name = "blog/search.html"
+    paginate_by = NUM_PUB_PAGE
+
+    def get_queryset(self):
+        self.query = self.request.GET.get("q", "").strip()
+        return search_posts(self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.query
+        return context
 
-class PostDetailView(DetailView):
+
+class PostDetailView(AnonymousCacheMixin, DetailView):
     model = Post
     template_name = "blog/detail.html"
     pk_url_kwarg = "post_id"
 
-    def get_object(self, **kwargs):
-        post_id = self.kwargs.get("post_id")
-        post = super().get_object()
-        if post.author == self.request.user:
-            return post
-        post = get_object_or_404(querying_posts(pk=post_id))
-        return post
+    def get_queryset(self):
+        return visible_posts(self.request.user)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
-        context["comments"] = self.object.comments.select_related(
-            "author"
-        ).all()
+        context["comments"], context["comments_cursor"] = comments_page(
+            self.object.comments.select_related("author")
+        )
         return context
 
+    def get_cache_tags(self, context):
+        return post_card_tags(self.object)
 
-class CategoryListView(ListView):
+
+class CommentListView(AnonymousCacheMixin, ListView):
+    """Очередная порция комментариев поста для кнопки «Показать ещё»."""
+
+    template_name = "includes/comment_list.html"
+    context_object_name = "comments"
+
+    def get_queryset(self):
+        self.post = get_object_or_404(
+            visible_posts(self.request.user), pk=self.kwargs["post_id"]
+        )
+        try:
+            comments, self.next_cursor = comments_page(
+                self.post.comments.select_related("author"),
+                self.request.GET.get("cursor"),
+            )
+        except InvalidCursor:
+            raise Http404("Неверный курсор")
+        return comments
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["post"] = self.post
+        context["comments_cursor"] = self.next_cursor
+        return context
+
+    def get_cache_tags(self, context):
+        return {post_tag(self.post.pk)}
+
+
+class CategoryListView(
+    FeedCacheMixin, CursorPaginationMixin, FeedCountMixin, ListView
+):
     template_name = "blog/category.html"
     paginate_by = NUM_PUB_PAGE
 
     def get_queryset(self):
-        category_slug = self.kwargs.get("category_slug")
-        category = get_object_or_404(
-            Category.objects, slug=category_slug, is_published=True
-        )
-        self.category = category
+        self.category = published_category(self.kwargs["category_slug"])
         return querying_posts(category=self.category)
 
+    def get_count_key(self):
+        return f"category:{self.category.pk}"
+
+    def get_count_tags(self):
+        return (category_tag(self.category.pk),)
+
+    def get_cache_tags(self, context):
+        # В шапке выводятся счётчики из сводки категории.
+        return {
+            *super().get_cache_tags(context),
+            stats_tag(CategoryStats, self.category.pk),
+        }
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["category"] = self.category
+        context["category_stats"] = category_stats(self.category.pk)
         return context
 
 
-class UserProfileView(ListView):
+class UserProfileView(
+    FeedCacheMixin, CursorPaginationMixin, FeedCountMixin, ListView
+):
     model = Post
     template_name = "blog/profile.html"
     context_object_name = "profile"
@@ -76,24 +162,32 @@ class UserProfileView(ListView):
     slug_url_kwarg = "username"
 
     def get_queryset(self):
-        user = get_object_or_404(
+        self.author = get_object_or_404(
             User, username=self.kwargs.get(self.slug_url_kwarg)
         )
-        if self.request.user == user:
+        if self.is_own_profile():
             return (
-                Post.objects.filter(author=user)
+                Post.objects.filter(author=self.author)
                 .select_related("author", "category", "location")
-                .annotate(comments_count=Count("comments"))
-                .order_by("-pub_date")
+                .order_by("-pub_date", "-id")
             )
+        return querying_posts(author=self.author)
 
-        return querying_posts()
+    def is_own_profile(self):
+        return self.request.user == self.author
+
+    def get_count_key(self):
+        if self.is_own_profile():
+            return f"author:{self.author.pk}:own"
+        return f"author:{self.author.pk}"
+
+    def get_count_tags(self):
+        return (author_tag(self.author.pk),)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["profile"] = get_object_or_404(
-            User, username=self.kwargs.get(self.slug_url_kwarg)
-        )
+        context["profile"] = self.author
+        context["profile_stats"] = profile_stats(self.author)
         return context
 
 
@@ -111,7 +205,7 @@ class UserEditView(LoginRequiredMixin, UpdateView):
         )
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(StreamingUploadMixin, LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = "blog/create.html"
@@ -126,7 +220,9 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostUpdateView(LoginRequiredMixin, AuthorRequiredMixin, UpdateView):
+class PostUpdateView(
+    StreamingUploadMixin, LoginRequiredMixin, AuthorRequiredMixin, UpdateView
+):
     form_class = PostForm
     model = Post
     template_name = "blog/create.html"
@@ -207,3 +303,23 @@ class CommentDeleteView(CommentAuthorMixin, DeleteView):
         return reverse(
             "blog:post_detail", kwargs={"post_id": self.kwargs["post_id"]}
         )
+
+
+def has_metrics_token(request):
+    token = settings.METRICS_TOKEN
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    return bool(token) and constant_time_compare(header, f"Bearer {token}")
+
+
+def metrics_view(request):
+    """Счётчики процесса для Prometheus.
+
+    Доступны сотрудникам и по токену METRICS_TOKEN, а не по адресу
+    клиента: за обратным прокси все запросы приходят с одного адреса.
+    """
+    if not (request.user.is_staff or has_metrics_token(request)):
+        raise Http404
+    return HttpResponse(
+        metrics.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -6,5 +6,13 @@ os.environ.setdefault(
     "DJANGO_SETTINGS_MODULE",
     "blogicum.settings",
 )
+# Под ASGI ленты и страницы постов обслуживают асинхронные представления.
+os.environ.setdefault("BLOGICUM_ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
+
+from blogicum.warmup import warm_templates  # noqa: E402
+from pages.prerender import load_pages  # noqa: E402
+
+warm_templates()
+load_pages()
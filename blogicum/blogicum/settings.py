@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,6 +36,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "blog.middleware.ViewMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -113,6 +115,10 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 CSRF_FAILURE_VIEW = "pages.views.csrf_failure"
 
+# Каталог страниц, собранных командой build_pages (см. pages.prerender).
+# None — страницы рендерятся на каждый запрос.
+PRERENDERED_PAGES_DIR = None
+
 LOGIN_REDIRECT_URL = "blog:index"
 
 MEDIA_URL = "/media/"
@@ -124,3 +130,70 @@ EMAIL_FILE_PATH = BASE_DIR / "sent_emails"
 LOGIN_URL = "login"
 
 MEDIA_ROOT = BASE_DIR / "media"
+
+# Бэкенд кэша выбирается переменной окружения BLOGICUM_CACHE:
+# locmem — память процесса, file — каталог cache/ рядом с проектом,
+# redis — любой Redis-совместимый сервер (нужен пакет django-redis).
+CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "blogicum",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "cache",
+    },
+    "redis": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": os.getenv(
+            "BLOGICUM_REDIS_URL", "redis://127.0.0.1:6379/1"
+        ),
+    },
+}
+
+CACHES = {
+    "default": CACHE_BACKENDS[os.getenv("BLOGICUM_CACHE", "locmem")],
+}
+
+# Хранилище сессий выбирается переменной окружения BLOGICUM_SESSIONS:
+# db — таблица django_session, запрос на каждой странице после входа;
+# cached_db — чтение из кэша, запись и в кэш, и в базу (для нескольких
+# процессов нужен общий кэш: file или redis); signed_cookies — сессия
+# целиком в подписанной cookie, без обращений к серверу, но выход
+# не отзывает сохранённые где-то копии cookie.
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+SESSION_ENGINE = SESSION_ENGINES[os.getenv("BLOGICUM_SESSIONS", "db")]
+
+# Пользователь сессии берётся из кэша (blog.backends). ModelBackend
+# остаётся для сессий, открытых до включения кэша.
+AUTHENTICATION_BACKENDS = [
+    "blog.backends.CachedModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
+# Эндпоинт metrics открыт сотрудникам и сборщику с заголовком
+# «Authorization: Bearer <токен>». Без токена — только сотрудникам.
+METRICS_TOKEN = os.getenv("BLOGICUM_METRICS_TOKEN") or None
+
+# Больше запросов на одну страницу — предупреждение о возможном N+1
+# в логе blog.middleware (None — не проверять).
+QUERY_BUDGET = 20
+
+# Как часто процесс сверяет версию справочников в LRU (blog.lookups)
+# с общим кэшем, секунды. С locmem сверка почти бесплатна, поэтому
+# здесь — при каждом обращении.
+LOOKUP_CACHE_CHECK_INTERVAL = 0
+
+# Асинхронные версии лент и страницы поста (blog.async_views) вместо
+# синхронных. blogicum.asgi включает их сам.
+ASYNC_VIEWS = os.getenv("BLOGICUM_ASYNC_VIEWS", "0") == "1"
+
+# Потоки для работы асинхронных представлений с базой. 0 — общий поток
+# синхронного кода Django; так же работают тесты, которым нужна своя
+# транзакция в одном соединении.
+ASYNC_DB_THREADS = 0
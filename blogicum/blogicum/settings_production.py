@@ -0,0 +1,93 @@
+"""Настройки для боевого окружения.
+
+Запуск: DJANGO_SETTINGS_MODULE=blogicum.settings_production.
+"""
+import os
+from copy import deepcopy
+
+from django.core.exceptions import ImproperlyConfigured
+
+from blogicum.settings import *  # noqa: F401,F403
+from blogicum.settings import (
+    BASE_DIR,
+    CACHE_BACKENDS,
+    DATABASES,
+    INSTALLED_APPS,
+    MIDDLEWARE,
+    SECRET_KEY,
+    SESSION_ENGINES,
+    TEMPLATES,
+)
+
+DEBUG = False
+
+SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", SECRET_KEY)
+
+ALLOWED_HOSTS = os.getenv(
+    "DJANGO_ALLOWED_HOSTS", "localhost,127.0.0.1"
+).split(",")
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if not middleware.startswith("debug_toolbar.")
+]
+
+# Шаблоны компилируются один раз на процесс и берутся из памяти.
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
+
+# Прогреть кэш шаблонов при старте процесса (см. blogicum.warmup).
+WARM_TEMPLATES = True
+
+# Страницы «О проекте», «Правила» и страницы ошибок собираются при
+# выкладке (manage.py build_pages) и отдаются из памяти.
+PRERENDERED_PAGES_DIR = BASE_DIR / "prerendered"
+
+# Соединение с базой живёт между запросами; при каждом новом соединении
+# SQLite настраивается прагмами из SQLITE_PRAGMAS (см. blog.signals).
+DATABASES = deepcopy(DATABASES)
+DATABASES["default"]["CONN_MAX_AGE"] = 600
+DATABASES["default"]["OPTIONS"] = {"timeout": 5}
+
+# WAL позволяет читать базу, пока в неё пишут комментарии.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+# Версии тегов кэша, справочники и сессии должны быть общими для всех
+# процессов: с locmem каждый процесс хранит свою копию и после правки
+# в другом процессе отдаёт устаревшие страницы.
+CACHE_BACKEND = os.getenv("BLOGICUM_CACHE", "file")
+if CACHE_BACKEND == "locmem":
+    raise ImproperlyConfigured(
+        "BLOGICUM_CACHE=locmem не подходит для боевого окружения: "
+        "кэш должен быть общим для процессов (file или redis)."
+    )
+CACHES = {"default": CACHE_BACKENDS[CACHE_BACKEND]}
+
+# Сессии читаются из кэша; BLOGICUM_SESSIONS=signed_cookies убирает
+# и запись в базу при входе.
+SESSION_ENGINE = SESSION_ENGINES[os.getenv("BLOGICUM_SESSIONS", "cached_db")]
+
+# Правка категории или места видна другим процессам не позже чем
+# через секунду.
+LOOKUP_CACHE_CHECK_INTERVAL = 1
+
+# Пул потоков для базы у асинхронных представлений под ASGI.
+ASYNC_DB_THREADS = int(os.getenv("BLOGICUM_ASYNC_DB_THREADS", "16"))
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.template.loader import get_template
+
+
+def warm_templates():
+    """Загружает все шаблоны из TEMPLATES_DIR в кэширующий загрузчик.
+
+    Первый запрос к каждой странице не тратит время на разбор
+    шаблонов. Возвращает число загруженных шаблонов.
+    """
+    if not getattr(settings, "WARM_TEMPLATES", False):
+        return 0
+    names = [
+        path.relative_to(settings.TEMPLATES_DIR).as_posix()
+        for path in sorted(settings.TEMPLATES_DIR.rglob("*.html"))
+    ]
+    for name in names:
+        get_template(name)
+    return len(names)
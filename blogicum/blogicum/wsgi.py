@@ -8,3 +8,9 @@ os.environ.setdefault(
 )
 
 application = get_wsgi_application()
+
+from blogicum.warmup import warm_templates  # noqa: E402
+from pages.prerender import load_pages  # noqa: E402
+
+warm_templates()
+load_pages()
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.prerender import build_pages
+
+
+class Command(BaseCommand):
+    help = (
+        "Рендерит «О проекте», «Правила» и страницы ошибок для анонимных "
+        "посетителей в PRERENDERED_PAGES_DIR. Запускайте при выкладке "
+        "после collectstatic и перезапускайте процессы: страницы читаются "
+        "в память при старте."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Каталог вместо PRERENDERED_PAGES_DIR.",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["output"] or settings.PRERENDERED_PAGES_DIR
+        if directory is None:
+            raise CommandError(
+                "Не задан PRERENDERED_PAGES_DIR; укажите --output или "
+                "запускайте с --settings=blogicum.settings_production."
+            )
+        names = build_pages(Path(directory))
+        self.stdout.write(f"Собрано страниц: {len(names)} в {directory}")
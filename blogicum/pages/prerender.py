@@ -0,0 +1,87 @@
+"""Статические страницы, собранные заранее.
+
+О проекте, правила и страницы ошибок почти не зависят от запроса, а
+каждый рендер проходит шаблон с шапкой, подвалом и тегами bootstrap —
+поток 404 от сканеров стоит столько же, сколько настоящие страницы.
+Команда build_pages при выкладке рендерит анонимный вариант этих
+страниц в PRERENDERED_PAGES_DIR, load_pages при старте процесса читает
+их в память, и представления отдают готовые байты. Вошедшим
+пользователям нужна своя шапка, поэтому им страницы рендерятся как
+обычно.
+"""
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import resolve, reverse
+from django.utils.html import escape
+
+# Имя страницы: шаблон и маршрут, который подсвечивается в шапке.
+PAGES = {
+    "about": ("pages/about.html", "pages:about"),
+    "rules": ("pages/rules.html", "pages:rules"),
+    "404": ("pages/404.html", None),
+    "500": ("pages/500.html", None),
+    "403csrf": ("pages/403csrf.html", None),
+}
+
+# Адрес запрошенной страницы на 404 подставляется при ответе.
+URL_PLACEHOLDER = "__requested_url__"
+
+_pages = {}
+
+
+def render_page(name):
+    """HTML страницы для анонимного посетителя."""
+    template_name, url_name = PAGES[name]
+    request = HttpRequest()
+    request.method = "GET"
+    request.user = AnonymousUser()
+    if url_name is not None:
+        request.path = request.path_info = reverse(url_name)
+        request.resolver_match = resolve(request.path)
+    return render_to_string(
+        template_name, {"requested_url": URL_PLACEHOLDER}, request
+    )
+
+
+def build_pages(directory):
+    """Записывает все страницы в directory; возвращает их имена."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in PAGES:
+        (directory / f"{name}.html").write_text(
+            render_page(name), encoding="utf-8"
+        )
+    return list(PAGES)
+
+
+def load_pages():
+    """Читает собранные страницы в память процесса; возвращает их
+    число. Без PRERENDERED_PAGES_DIR или сборки ничего не делает."""
+    _pages.clear()
+    directory = settings.PRERENDERED_PAGES_DIR
+    if directory is None:
+        return 0
+    for name in PAGES:
+        path = directory / f"{name}.html"
+        if path.is_file():
+            _pages[name] = path.read_bytes()
+    return len(_pages)
+
+
+def is_anonymous(request):
+    # Ошибка могла случиться раньше AuthenticationMiddleware.
+    user = getattr(request, "user", None)
+    return user is None or not user.is_authenticated
+
+
+def prerendered_response(name, status=200, requested_url=None):
+    """Ответ из собранной страницы или None, если её нет в памяти."""
+    body = _pages.get(name)
+    if body is None:
+        return None
+    if requested_url is not None:
+        body = body.replace(
+            URL_PLACEHOLDER.encode(), escape(requested_url).encode()
+        )
+    return HttpResponse(body, status=status)
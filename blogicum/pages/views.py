@@ -1,22 +1,61 @@
 from django.shortcuts import render
 from django.views.generic import TemplateView
 
+from blog.mixins import AnonymousCacheMixin
+from pages.prerender import is_anonymous, prerendered_response
 
-class About(TemplateView):
+
+class PrerenderedPageMixin:
+    """Отдаёт анонимным посетителям страницу, собранную build_pages."""
+
+    prerendered_name = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == "GET" and is_anonymous(request):
+            response = prerendered_response(self.prerendered_name)
+            if response is not None:
+                return response
+        return super().dispatch(request, *args, **kwargs)
+
+
+class About(PrerenderedPageMixin, AnonymousCacheMixin, TemplateView):
     template_name = "pages/about.html"
+    prerendered_name = "about"
 
 
-class Rules(TemplateView):
+class Rules(PrerenderedPageMixin, AnonymousCacheMixin, TemplateView):
     template_name = "pages/rules.html"
+    prerendered_name = "rules"
 
 
 def page_not_found(request, exception):
-    return render(request, "pages/404.html", status=404)
+    requested_url = request.build_absolute_uri()
+    if is_anonymous(request):
+        response = prerendered_response(
+            "404", status=404, requested_url=requested_url
+        )
+        if response is not None:
+            return response
+    return render(
+        request,
+        "pages/404.html",
+        {"requested_url": requested_url},
+        status=404,
+    )
 
 
 def server_error(request):
+    # Шапка вошедшего пользователя тут не нужна: страница ошибки не должна
+    # снова ходить в базу или сессию.
+    response = prerendered_response("500", status=500)
+    if response is not None:
+        return response
     return render(request, "pages/500.html", status=500)
 
 
 def csrf_failure(request, reason=""):
+    if is_anonymous(request):
+        response = prerendered_response("403csrf", status=403)
+        if response is not None:
+            return response
     return render(request, "pages/403csrf.html", status=403)
@@ -10,6 +10,7 @@ from typing import (Any, Iterable, List, NamedTuple, Optional, Tuple, Type,
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Field, Model
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -32,6 +33,11 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,58 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_api_index_lists_published_posts(
+        client, post_with_published_location
+):
+    response = client.get("/api/posts/")
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/json"
+    data = response.json()
+    assert [row["id"] for row in data["results"]] == [
+        post_with_published_location.id
+    ]
+    assert data["results"][0]["author"] == (
+        post_with_published_location.author.username
+    )
+    assert data["next_cursor"] is None
+
+
+def test_api_post_detail_with_comments(
+        client, mixer, post_with_published_location
+):
+    comment = mixer.blend("blog.Comment", post=post_with_published_location)
+    response = client.get(f"/api/posts/{post_with_published_location.id}/")
+    data = response.json()
+    assert data["comment_count"] == 1
+    assert [row["id"] for row in data["comments"]] == [comment.id]
+
+
+def test_api_unpublished_post_not_found(client, post_with_published_location):
+    post_with_published_location.is_published = False
+    post_with_published_location.save()
+    response = client.get(f"/api/posts/{post_with_published_location.id}/")
+    assert response.status_code == 404
+
+
+def test_api_conditional_get(
+        client, django_assert_num_queries, post_with_published_location
+):
+    url = f"/api/posts/{post_with_published_location.id}/"
+    etag = client.get(url)["ETag"]
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+
+def test_api_etag_changes_with_comments(
+        client, mixer, post_with_published_location
+):
+    url = f"/api/posts/{post_with_published_location.id}/"
+    etag = client.get(url)["ETag"]
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
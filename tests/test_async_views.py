@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncClient
+from django.urls import include, path
+
+from blog import metrics
+from blog.async_views import AsyncBlogListView, AsyncPostDetailView
+from blog.middleware import ViewMetricsMiddleware
+
+pytestmark = [pytest.mark.django_db, pytest.mark.urls(__name__)]
+
+urlpatterns = [
+    path("async/", AsyncBlogListView.as_view(), name="async_index"),
+    path("async/posts/<int:post_id>/", AsyncPostDetailView.as_view()),
+    path("", include("blogicum.urls")),
+]
+
+
+def test_async_view_is_coroutine():
+    view = AsyncPostDetailView.as_view()
+    assert asyncio.iscoroutinefunction(view)
+    assert view.view_class is AsyncPostDetailView
+
+
+def test_async_views_match_sync(client, post_with_published_location):
+    post_id = post_with_published_location.id
+    for sync_url, async_url in (
+        ("/", "/async/"),
+        (f"/posts/{post_id}/", f"/async/posts/{post_id}/"),
+    ):
+        expected = client.get(sync_url)
+        response = client.get(async_url)
+        assert response.status_code == 200
+        assert response.content == expected.content
+
+
+def test_async_view_not_found(client):
+    assert client.get("/async/posts/1000/").status_code == 404
+
+
+def test_async_client_records_metrics(post_with_published_location):
+    metrics.reset()
+    response = async_to_sync(AsyncClient().get)("/async/")
+    assert response.status_code == 200
+    counters = metrics.view_snapshot()
+    assert counters["view_queries_total", "async_index"] > 0
+    assert counters["view_render_seconds_total", "async_index"] > 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_view_in_thread_pool(
+        settings, client, post_with_published_location
+):
+    settings.ASYNC_DB_THREADS = 2
+    response = client.get(f"/async/posts/{post_with_published_location.id}/")
+    assert response.status_code == 200
+    assert post_with_published_location.title in response.content.decode()
+
+
+def test_metrics_middleware_async_chain(rf, post_with_published_location):
+    metrics.reset()
+    middleware = ViewMetricsMiddleware(AsyncBlogListView.as_view())
+    assert asyncio.iscoroutinefunction(middleware)
+    request = rf.get("/")
+    request.user = AnonymousUser()
+    response = async_to_sync(middleware)(request)
+    assert response.status_code == 200
+    assert metrics.view_snapshot()["view_queries_total", "unresolved"] > 0
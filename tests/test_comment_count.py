@@ -0,0 +1,52 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+
+def test_comment_count_survives_author_cascade(
+        mixer, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post)
+    mixer.blend("blog.Comment", post=post, author=another_user)
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+def test_comment_count_follows_moved_comment(
+        mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    other = mixer.blend("blog.Post", author=user)
+    comments = mixer.cycle(2).blend("blog.Comment", post=post)
+    comment = type(comments[0]).objects.get(pk=comments[0].pk)
+    comment.post = other
+    comment.save()
+    comment.save()
+    post.refresh_from_db()
+    other.refresh_from_db()
+    assert (post.comment_count, other.comment_count) == (1, 1)
+
+
+def test_reconcile_comment_counts(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=10)
+    call_command("reconcile_comment_counts", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 2
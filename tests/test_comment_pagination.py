@@ -0,0 +1,52 @@
+import re
+
+import pytest
+
+from blog.constants import COMMENTS_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(COMMENTS_PER_PAGE + 5).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+
+
+def _comment_ids(content):
+    return [int(pk) for pk in re.findall(r'name="comment_(\d+)"', content)]
+
+
+def test_detail_shows_first_comments_page(
+        user_client, post_with_published_location, many_comments
+):
+    response = user_client.get(f"/posts/{post_with_published_location.id}/")
+    ids = _comment_ids(response.content.decode())
+    assert ids == [comment.id for comment in many_comments][
+        :COMMENTS_PER_PAGE
+    ]
+    assert response.context["comments_cursor"]
+
+
+def test_load_more_returns_rest(
+        user_client, post_with_published_location, many_comments
+):
+    detail = user_client.get(f"/posts/{post_with_published_location.id}/")
+    response = user_client.get(
+        f"/posts/{post_with_published_location.id}/comments/",
+        {"cursor": detail.context["comments_cursor"]},
+    )
+    assert response.status_code == 200
+    assert _comment_ids(response.content.decode()) == [
+        comment.id for comment in many_comments
+    ][COMMENTS_PER_PAGE:]
+    assert "data-load-more" not in response.content.decode()
+
+
+def test_load_more_invalid_cursor(user_client, post_with_published_location):
+    response = user_client.get(
+        f"/posts/{post_with_published_location.id}/comments/",
+        {"cursor": "garbage"},
+    )
+    assert response.status_code == 404
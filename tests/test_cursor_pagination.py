@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    same_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(25).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=same_date,
+    )
+
+
+@pytest.fixture
+def no_response_cache(monkeypatch):
+    # Закэшированный ответ анонимной ленты приходит без context.
+    monkeypatch.setattr(
+        "blog.mixins.get_cached_response", lambda request: None
+    )
+
+
+def walk(client, token, direction):
+    seen = []
+    while token is not None:
+        page = client.get("/", {"cursor": token}).context["page_obj"]
+        ids = [post.id for post in page]
+        seen = seen + ids if direction == "next" else ids + seen
+        token = getattr(page, f"{direction}_cursor")
+    return seen
+
+
+def test_cursor_walk_matches_numbered_order(
+        client, feed_posts, no_response_cache
+):
+    expected = sorted((post.id for post in feed_posts), reverse=True)
+    assert walk(client, "", "next") == expected
+
+    last_page = client.get("/", {"cursor": ""}).context["page_obj"]
+    while last_page.next_cursor:
+        last_page = client.get(
+            "/", {"cursor": last_page.next_cursor}
+        ).context["page_obj"]
+    backwards = walk(client, last_page.previous_cursor, "previous")
+    assert backwards + [post.id for post in last_page] == expected
+
+
+def test_invalid_cursor_is_404(client, feed_posts):
+    assert client.get("/", {"cursor": "garbage"}).status_code == 404
@@ -0,0 +1,39 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.dump import dump_models
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("name", ["dump.jsonl", "dump.jsonl.gz"])
+def test_export_import_roundtrip(
+        tmp_path, name, mixer, post_with_published_location
+):
+    comments = mixer.cycle(3).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+    path = tmp_path / name
+    call_command("export_blog", str(path), stdout=StringIO())
+    # Сериализатор Django хранит время с точностью до миллисекунд.
+    created_at = {
+        comment.pk: comment.created_at.replace(
+            microsecond=comment.created_at.microsecond // 1000 * 1000
+        )
+        for comment in comments
+    }
+    for model in reversed(dump_models()):
+        model.objects.all().delete()
+
+    call_command("import_blog", str(path), batch=2, stdout=StringIO())
+
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert post.title == post_with_published_location.title
+    assert post.comment_count == 3
+    assert post.is_live
+    assert {
+        comment.pk: comment.created_at for comment in Comment.objects.all()
+    } == created_at
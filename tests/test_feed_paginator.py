@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    counts = [q for q in ctx.captured_queries if "COUNT(" in q["sql"]]
+    return response, len(counts)
+
+
+def test_feed_count_is_cached_and_invalidated(
+        client, many_posts_with_published_locations
+):
+    response, counts = count_queries(client, "/")
+    assert counts == 1
+    assert response.context["paginator"].count == 20
+
+    response, counts = count_queries(client, "/")
+    assert counts == 0
+
+    post = many_posts_with_published_locations[0]
+    post.is_published = False
+    post.save()
+    response, counts = count_queries(client, "/")
+    assert counts == 1
+    assert response.context["paginator"].count == 19
+
+
+def test_feed_count_shared_between_pages(
+        client, many_posts_with_published_locations
+):
+    count_queries(client, "/")
+    response, counts = count_queries(client, "/?page=2")
+    assert counts == 0
+    assert response.context["paginator"].count == 20
+
+
+def test_page_range_is_windowed(
+        mixer, user, published_category, client
+):
+    mixer.cycle(150).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    page = client.get("/", {"page": 8}).context["page_obj"]
+    page_range = list(page.page_range)
+    assert page_range == [1, "…", 6, 7, 8, 9, 10, "…", 15]
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.scheduler import publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("url", ["/feeds/rss/", "/feeds/atom/"])
+def test_feed_lists_published_posts(
+        client, url, post_with_published_location
+):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert post_with_published_location.title in response.content.decode()
+    assert response["ETag"]
+    assert response["Last-Modified"]
+
+
+def test_category_feed(client, post_with_published_location):
+    slug = post_with_published_location.category.slug
+    response = client.get(f"/category/{slug}/rss/")
+    assert post_with_published_location.title in response.content.decode()
+    assert client.get("/category/missing/rss/").status_code == 404
+
+
+def test_feed_served_from_stored_document(
+        client, django_assert_num_queries, post_with_published_location
+):
+    etag = client.get("/feeds/rss/")["ETag"]
+    with django_assert_num_queries(0):
+        response = client.get("/feeds/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+
+def test_feed_rebuilt_on_post_edit(client, post_with_published_location):
+    client.get("/feeds/rss/")
+    post_with_published_location.title = "Новый заголовок"
+    post_with_published_location.save()
+    assert "Новый заголовок" in client.get("/feeds/rss/").content.decode()
+
+
+def test_feed_picks_up_scheduled_post(
+        client, mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert post.title not in client.get("/feeds/rss/").content.decode()
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    assert publish_due_posts() == 1
+    assert post.title in client.get("/feeds/rss/").content.decode()
@@ -0,0 +1,31 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+from blog.secondary_func import actual_comment_count
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_generate_data_consistent():
+    call_command(
+        "generate_data",
+        users=5,
+        categories=3,
+        locations=2,
+        posts=120,
+        batch=50,
+        stdout=StringIO(),
+    )
+    assert Post.objects.count() == 120
+    assert Comment.objects.exists()
+    # Денормализованные поля совпадают с тем, что поставили бы сигналы.
+    assert not Post.objects.exclude(
+        comment_count=actual_comment_count()
+    ).exists()
+    for post in Post.objects.all():
+        expected = post.is_live
+        post.save()
+        assert post.is_live == expected
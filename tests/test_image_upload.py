@@ -0,0 +1,94 @@
+import struct
+import zlib
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import (
+    SimpleUploadedFile,
+    TemporaryUploadedFile,
+)
+from django.test import Client
+from django.utils import timezone
+from PIL import Image
+
+from blog import metrics
+from blog.forms import LazyImageField
+
+pytestmark = [pytest.mark.django_db]
+
+
+def png_header(width, height):
+    """PNG только с заголовком: пиксели не нужны, чтобы узнать размеры."""
+    def chunk(kind, data):
+        body = kind + data
+        return (struct.pack(">I", len(data)) + body
+                + struct.pack(">I", zlib.crc32(body)))
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IEND", b"")
+
+
+def post_data(published_category, image):
+    return {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%d %H:%M"),
+        "category": published_category.id,
+        "is_published": True,
+        "image": image,
+    }
+
+
+def test_huge_image_is_rejected_by_header(
+        user_client, published_category, PostModel
+):
+    metrics.reset()
+    image = SimpleUploadedFile(
+        "bomb.png", png_header(20000, 20000), content_type="image/png"
+    )
+    response = user_client.post(
+        "/posts/create/", post_data(published_category, image)
+    )
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors
+    assert not PostModel.objects.exists()
+    assert metrics.snapshot()["image_uploads_rejected"] == 1
+
+
+def test_regular_image_is_streamed_to_disk(
+        user_client, published_category, PostModel
+):
+    metrics.reset()
+    img_io = BytesIO()
+    Image.new("RGB", (120, 80)).save(img_io, "JPEG")
+    image = SimpleUploadedFile(
+        "photo.jpg", img_io.getvalue(), content_type="image/jpeg"
+    )
+    response = user_client.post(
+        "/posts/create/", post_data(published_category, image)
+    )
+    assert response.status_code == 302
+    assert PostModel.objects.get().image.width == 120
+    snapshot = metrics.snapshot()
+    assert snapshot["image_uploads"] == 1
+    assert snapshot["image_upload_bytes"] == len(img_io.getvalue())
+
+
+def test_validated_image_is_closed():
+    img_io = BytesIO()
+    Image.new("RGB", (120, 80)).save(img_io, "JPEG")
+    upload = TemporaryUploadedFile(
+        "photo.jpg", "image/jpeg", len(img_io.getvalue()), None
+    )
+    upload.write(img_io.getvalue())
+    upload.seek(0)
+    with upload:
+        image = LazyImageField().clean(upload).image
+    assert image.fp is None
+    assert (image.format, image.size) == ("JPEG", (120, 80))
+
+
+def test_csrf_is_still_checked(user):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    assert client.post("/posts/create/", {}).status_code == 403
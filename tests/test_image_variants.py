@@ -0,0 +1,88 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from PIL import Image, ImageOps
+
+from blog.images import build_variants, variant_name, wait_for_variants
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post_with_large_image(mixer, user, published_category):
+    img_io = BytesIO()
+    Image.new("RGB", (1500, 1000), color=(73, 109, 137)).save(img_io, "JPEG")
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=ImageFile(img_io, name="large_image.jpg"),
+    )
+
+
+def test_variants_are_built_and_used_in_srcset(
+        user_client, post_with_large_image
+):
+    post = post_with_large_image
+    assert post.image_variants == {}
+
+    variants = build_variants(post.id)
+    assert variants == {"width": 1500, "widths": [640, 1200, 1280]}
+    post.refresh_from_db()
+    stem = post.image.name.rsplit(".", 1)[0]
+    for width in variants["widths"]:
+        assert post.image.storage.exists(f"{stem}.{width}w.jpg")
+
+    index = user_client.get("/").content.decode()
+    assert f"{stem}.640w.jpg 640w, /media/{stem}.1280w.jpg 1280w" in index
+    detail = user_client.get(f"/posts/{post.id}/").content.decode()
+    assert f"{stem}.1200w.jpg 1200w, /media/{post.image.name} 1500w" in detail
+
+
+def test_new_image_resets_variants(post_with_large_image):
+    post = post_with_large_image
+    build_variants(post.id)
+    post.refresh_from_db()
+    img_io = BytesIO()
+    Image.new("RGB", (300, 300)).save(img_io, "JPEG")
+    post.image = ImageFile(img_io, name="other_image.jpg")
+    post.save()
+    post.refresh_from_db()
+    assert post.image_variants == {}
+
+
+@pytest.mark.parametrize("replace", [True, False])
+def test_old_variants_deleted(
+        post_with_large_image, django_capture_on_commit_callbacks, replace
+):
+    post = post_with_large_image
+    build_variants(post.id)
+    post = Post.objects.get(pk=post.pk)
+    storage = post.image.storage
+    old = [variant_name(post.image.name, width) for width in (640, 1280)]
+    assert all(storage.exists(name) for name in old)
+    if replace:
+        img_io = BytesIO()
+        Image.new("RGB", (300, 300)).save(img_io, "JPEG")
+        post.image = ImageFile(img_io, name="other_image.jpg")
+    else:
+        post.image = None
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    wait_for_variants()
+    assert not any(storage.exists(name) for name in old)
+
+
+def test_stale_build_cleans_up(post_with_large_image, monkeypatch):
+    post = post_with_large_image
+    transpose = ImageOps.exif_transpose
+
+    def replace_meanwhile(image):
+        Post.objects.filter(pk=post.pk).update(image="post_images/new.jpg")
+        return transpose(image)
+
+    monkeypatch.setattr(ImageOps, "exif_transpose", replace_meanwhile)
+    assert build_variants(post.id) == []
+    assert not post.image.storage.exists(variant_name(post.image.name, 640))
@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import metrics
+from blog.lookups import LookupCache, attach_lookups, categories
+from blog.models import Category
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clean_lookups():
+    categories.clear()
+    metrics.reset()
+    yield
+    categories.clear()
+
+
+def lookup_counters(name):
+    counters = metrics.lookup_snapshot()
+    return (
+        counters.get(("lookup_hits_total", name), 0),
+        counters.get(("lookup_misses_total", name), 0),
+    )
+
+
+def test_hits_after_first_lookup(published_category):
+    with CaptureQueriesContext(connection) as queries:
+        first = categories.get(slug=published_category.slug)
+        second = categories.get(pk=published_category.pk)
+    assert first == second == published_category
+    assert first is not second
+    # Первая выборка — из базы, вторая — из памяти; версия тега
+    # сверяется через кэш, а не через базу.
+    assert len(queries) == 1
+    assert lookup_counters("category") == (1, 1)
+    assert metrics.lookup_hit_rate("category") == 0.5
+
+
+def test_missing_object_not_cached():
+    assert categories.get(slug="missing") is None
+    assert categories.get(slug="missing") is None
+    assert lookup_counters("category") == (0, 2)
+
+
+def test_save_invalidates(published_category):
+    categories.get(pk=published_category.pk)
+    published_category.title = "Новое название"
+    published_category.save()
+    assert categories.get(pk=published_category.pk).title == "Новое название"
+
+
+def test_other_process_sees_invalidation(published_category):
+    other = LookupCache("category", Category, fields=("slug",))
+    other.get(pk=published_category.pk)
+    Category.objects.filter(pk=published_category.pk).update(title="Иное")
+    assert other.get(pk=published_category.pk).title != "Иное"
+    # Правка через сигнал в «этом» процессе сбрасывает LRU «другого»
+    # через версию тега в общем кэше.
+    categories.invalidate()
+    assert other.get(pk=published_category.pk).title == "Иное"
+
+
+def test_eviction(mixer):
+    lookup = LookupCache("category", Category, fields=("slug",), maxsize=2)
+    first, second, third = mixer.cycle(3).blend(
+        "blog.Category", is_published=True
+    )
+    for category in (first, second, third):
+        lookup.get(pk=category.pk)
+    with CaptureQueriesContext(connection) as queries:
+        lookup.get(slug=third.slug)
+        lookup.get(slug=first.slug)
+    assert len(queries) == 1
+
+
+def test_unpublished_category_page(client, mixer):
+    category = mixer.blend("blog.Category", is_published=False)
+    assert client.get(f"/category/{category.slug}/").status_code == 404
+
+
+def test_index_uses_lru(
+        client, mixer, user, published_category, published_location
+):
+    mixer.cycle(5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=timezone.now() - timedelta(days=1),
+        is_published=True,
+    )
+    # Сводки при создании постов тоже читают категории из LRU.
+    categories.clear()
+    metrics.reset()
+    # Категория и место читаются из базы один раз на страницу, а не
+    # присоединяются к каждой карточке.
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert response.status_code == 200
+    for table in ("blog_category", "blog_location"):
+        assert len(
+            [query for query in queries if f'FROM "{table}"' in query["sql"]]
+        ) == 1
+    assert lookup_counters("category") == (4, 1)
+
+
+def test_attach_keeps_loaded_relations(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() - timedelta(days=1),
+        is_published=True,
+    )
+    post = type(post).objects.select_related("category").get(pk=post.pk)
+    metrics.reset()
+    attach_lookups((post,))
+    assert lookup_counters("category") == (0, 0)
+
+
+def test_prometheus_lookup_series(published_category):
+    categories.get(pk=published_category.pk)
+    categories.get(pk=published_category.pk)
+    output = metrics.render_prometheus()
+    assert 'blogicum_lookup_hits_total{lookup="category"} 1' in output
+    assert 'blogicum_lookup_misses_total{lookup="category"} 1' in output
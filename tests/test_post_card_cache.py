@@ -0,0 +1,27 @@
+import pytest
+
+from blog import metrics
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_cards_are_reused_until_post_changes(
+        mixer, user_client, many_posts_with_published_locations
+):
+    metrics.reset()
+    first = user_client.get("/").content.decode()
+    assert metrics.snapshot() == {"post_card_cache_misses": 10}
+
+    assert user_client.get("/").content.decode() == first
+    assert metrics.snapshot()["post_card_cache_hits"] == 10
+
+    page_posts = list(user_client.get("/").context["page_obj"])
+    post = page_posts[0]
+    mixer.blend("blog.Comment", post=post)
+    metrics.reset()
+    content = user_client.get("/").content.decode()
+    assert metrics.snapshot() == {
+        "post_card_cache_hits": 9,
+        "post_card_cache_misses": 1,
+    }
+    assert "Комментарии (1)" in content
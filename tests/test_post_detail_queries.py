@@ -0,0 +1,37 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location):
+    mixer.cycle(5).blend("blog.Comment", post=post_with_published_location)
+    return post_with_published_location
+
+
+def test_detail_queries_anonymous(
+        client, commented_post, django_assert_num_queries
+):
+    # Пост со связанными объектами и комментарии с авторами.
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{commented_post.id}/")
+    assert response.status_code == 200
+
+
+def test_detail_queries_author(
+        user_client, commented_post, django_assert_num_queries
+):
+    # Плюс сессия и пользователь.
+    with django_assert_num_queries(4):
+        response = user_client.get(f"/posts/{commented_post.id}/")
+    assert response.status_code == 200
+
+
+def test_unpublished_post_visible_only_to_author(
+        user_client, another_user_client, commented_post
+):
+    commented_post.is_published = False
+    commented_post.save()
+    url = f"/posts/{commented_post.id}/"
+    assert user_client.get(url).status_code == 200
+    assert another_user_client.get(url).status_code == 404
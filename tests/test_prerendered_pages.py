@@ -0,0 +1,57 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.test.utils import override_settings
+
+from pages.prerender import load_pages
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def prerendered(tmp_path):
+    with override_settings(PRERENDERED_PAGES_DIR=tmp_path):
+        call_command("build_pages", stdout=StringIO())
+        assert load_pages() == 5
+        yield tmp_path
+    load_pages()
+
+
+def test_anonymous_pages_served_from_memory(client, prerendered):
+    for url, name in (("/pages/about/", "about"), ("/pages/rules/", "rules")):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert not response.templates
+        assert response.content == (prerendered / f"{name}.html").read_bytes()
+
+
+def test_about_link_highlighted(client, prerendered):
+    content = client.get("/pages/about/").content.decode()
+    assert 'text-white " href="/pages/about/"' in content
+
+
+def test_not_found_inserts_escaped_url(client, prerendered):
+    response = client.get("/missing/<b>/")
+    assert response.status_code == 404
+    assert not response.templates
+    content = response.content.decode()
+    assert "http://testserver/missing/%3Cb%3E/" in content
+    assert "__requested_url__" not in content
+
+
+def test_logged_in_user_gets_own_header(user_client, user, prerendered):
+    response = user_client.get("/pages/about/")
+    assert response.templates
+    assert user.username in response.content.decode()
+
+
+def test_not_built_falls_back_to_templates(client):
+    response = client.get("/missing/")
+    assert response.status_code == 404
+    assert "pages/404.html" in [t.name for t in response.templates]
+
+
+def test_build_requires_directory():
+    with pytest.raises(CommandError):
+        call_command("build_pages")
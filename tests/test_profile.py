@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, published_category):
+    def make(author, is_published=True):
+        return mixer.blend(
+            "blog.Post",
+            author=author,
+            category=published_category,
+            pub_date=timezone.now() - timedelta(days=1),
+            is_published=is_published,
+        )
+
+    return make
+
+
+def test_visitor_sees_only_author_posts(
+        another_user_client, user, another_user, make_post
+):
+    own = make_post(user)
+    make_post(another_user)
+    hidden = make_post(user, is_published=False)
+    response = another_user_client.get(f"/profile/{user.username}/")
+    assert list(response.context["page_obj"]) == [own]
+    assert response.context["profile"] == user
+    assert response.context["profile_stats"]["posts"] == 1
+    assert hidden.title not in response.content.decode()
+
+
+def test_owner_sees_unpublished_posts(user_client, user, make_post):
+    make_post(user)
+    make_post(user, is_published=False)
+    response = user_client.get(f"/profile/{user.username}/")
+    assert len(response.context["page_obj"]) == 2
+    assert response.context["profile_stats"]["posts"] == 1
+
+
+def test_user_fetched_once(another_user_client, user, make_post):
+    make_post(user)
+    with CaptureQueriesContext(connection) as queries:
+        response = another_user_client.get(f"/profile/{user.username}/")
+    assert response.status_code == 200
+    lookups = [
+        query["sql"]
+        for query in queries
+        if '"auth_user"."username" =' in query["sql"]
+    ]
+    assert len(lookups) == 1
+
+
+def test_profile_stats_cached_and_invalidated(
+        another_user_client, user, make_post
+):
+    url = f"/profile/{user.username}/"
+    make_post(user)
+    another_user_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        another_user_client.get(url)
+    # Сессия, автор и страница постов; пользователь сессии, число постов
+    # и шапка — из кэша.
+    assert len(queries) == 3
+
+    make_post(user)
+    assert another_user_client.get(url).context["profile_stats"]["posts"] == 2
+
+    user.is_staff = True
+    user.save()
+    response = another_user_client.get(url)
+    assert response.context["profile_stats"]["is_staff"]
+    assert "Роль: Админ" in response.content.decode()
@@ -0,0 +1,63 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, len(ctx.captured_queries)
+
+
+def test_anonymous_pages_are_served_from_cache(
+        client, post_with_published_location
+):
+    for url in ("/", f"/posts/{post_with_published_location.id}/"):
+        _, first = get_with_queries(client, url)
+        _, second = get_with_queries(client, url)
+        assert first > 0
+        assert second == 0
+
+
+def test_comment_purges_only_its_post(
+        mixer, client, post_with_published_location, post_of_another_author
+):
+    post = post_with_published_location
+    other = post_of_another_author
+    get_with_queries(client, f"/posts/{post.id}/")
+    get_with_queries(client, f"/posts/{other.id}/")
+
+    comment = mixer.blend("blog.Comment", post=post)
+    response, queries = get_with_queries(client, f"/posts/{post.id}/")
+    assert queries > 0
+    assert f"comment_{comment.id}" in response.content.decode()
+    _, queries = get_with_queries(client, f"/posts/{other.id}/")
+    assert queries == 0
+
+
+def test_category_edit_purges_its_feed(
+        client, post_with_published_location, post_with_another_category
+):
+    category = post_with_published_location.category
+    other = post_with_another_category.category
+    get_with_queries(client, f"/category/{category.slug}/")
+    get_with_queries(client, f"/category/{other.slug}/")
+
+    category.title = "Новое название"
+    category.save()
+    response, queries = get_with_queries(client, f"/category/{category.slug}/")
+    assert queries > 0
+    assert "Новое название" in response.content.decode()
+    _, queries = get_with_queries(client, f"/category/{other.slug}/")
+    assert queries == 0
+
+
+def test_logged_in_users_bypass_cache(user_client):
+    # Первый запрос кладёт пользователя сессии в кэш.
+    user_client.get("/pages/about/")
+    _, first = get_with_queries(user_client, "/pages/about/")
+    _, second = get_with_queries(user_client, "/pages/about/")
+    assert second == first
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.scheduler import next_scheduled_date, publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def _make_due(post):
+    # Время «наступает» без ожидания: дата сдвигается в обход сигналов.
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+
+
+def test_post_live_on_save(post_with_published_location, scheduled_post):
+    assert post_with_published_location.is_live
+    assert not scheduled_post.is_live
+    post_with_published_location.is_published = False
+    post_with_published_location.save()
+    assert not post_with_published_location.is_live
+
+
+def test_scheduled_post_hidden_until_promoted(client, scheduled_post):
+    assert next_scheduled_date() == scheduled_post.pub_date
+    _make_due(scheduled_post)
+    # Без планировщика пост в ленту не попадает, а закэшированная
+    # страница остаётся верной.
+    assert scheduled_post.title not in client.get("/").content.decode()
+    assert publish_due_posts() == 1
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.is_live
+    assert scheduled_post.title in client.get("/").content.decode()
+    assert publish_due_posts() == 0
+
+
+def test_unpublished_post_not_promoted(scheduled_post):
+    scheduled_post.is_published = False
+    scheduled_post.save()
+    _make_due(scheduled_post)
+    assert publish_due_posts() == 0
+    assert next_scheduled_date() is None
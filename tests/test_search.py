@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.search import search_posts, stem
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    def blend(title, text, is_published=True):
+        return mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=is_published,
+            pub_date=timezone.now() - timedelta(days=1),
+            title=title,
+            text=text,
+        )
+
+    return {
+        "cats": blend("Мои кошки", "Рассказ о домашних кошках и котятах <b>"),
+        "dogs": blend("Собаки", "Про собак, но кошка тоже упоминается."),
+        "hidden": blend("Кошка", "Снятый с публикации.", is_published=False),
+    }
+
+
+def test_stem_strips_russian_endings():
+    assert stem("кошками") == stem("кошки") == "кошк"
+    assert stem("кот") == "кот"
+
+
+def test_search_matches_word_forms_and_ranks_title(searchable_posts):
+    found = list(search_posts("кошками"))
+    assert found[0] == searchable_posts["cats"]
+    assert set(found) == {searchable_posts["cats"], searchable_posts["dogs"]}
+
+
+def test_search_follows_index_updates(searchable_posts):
+    post = searchable_posts["dogs"]
+    post.text = "Теперь только про собак."
+    post.save()
+    assert list(search_posts("кошка")) == [searchable_posts["cats"]]
+    searchable_posts["cats"].delete()
+    assert list(search_posts("кошка")) == []
+
+
+def test_search_ignores_query_syntax(searchable_posts):
+    assert list(search_posts('" OR * NEAR(')) == []
+
+
+def test_search_page_highlights_snippet(client, searchable_posts):
+    response = client.get("/search/", {"q": "котята"})
+    content = response.content.decode()
+    assert response.status_code == 200
+    assert "<mark>котятах</mark>" in content
+    assert "<b>" not in content
@@ -0,0 +1,97 @@
+import pickle
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+def locmem_values():
+    return [pickle.loads(value) for value in cache._cache.values()]
+
+
+def session_and_user_queries(client, url="/"):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [
+        query["sql"]
+        for query in queries
+        if 'FROM "django_session"' in query["sql"]
+        or 'FROM "auth_user" WHERE "auth_user"."id" =' in query["sql"]
+    ]
+
+
+@pytest.mark.parametrize("engine", ["cached_db", "signed_cookies"])
+def test_logged_in_page_skips_session_and_user(engine, user):
+    with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[engine]):
+        client = Client()
+        client.force_login(user)
+        session_and_user_queries(client)
+        assert session_and_user_queries(client) == []
+        assert user.username in client.get("/").content.decode()
+
+
+def test_user_cache_follows_changes(user_client, user):
+    user_client.get("/")
+    user.username = "renamed"
+    user.save()
+    assert "renamed" in user_client.get("/").content.decode()
+
+
+def test_password_change_ends_session(user_client, user):
+    user_client.get("/")
+    user.set_password("new-password")
+    user.save()
+    response = user_client.get("/")
+    assert not response.wsgi_request.user.is_authenticated
+
+
+def test_deleted_user_logged_out(user_client, user):
+    user_client.get("/")
+    user.delete()
+    assert not user_client.get("/").wsgi_request.user.is_authenticated
+
+
+def test_password_hash_not_cached(user_client, user):
+    user_client.get("/")
+    cached = [
+        value
+        for value in locmem_values()
+        if isinstance(value, dict) and "session_auth_hash" in value
+    ]
+    assert cached
+    assert user.password not in repr(cached)
+
+
+def test_password_change_keeps_own_session(user_client, user):
+    user.set_password("old-password")
+    user.save()
+    user_client.force_login(user)
+    user_client.get("/")
+    response = user_client.post(
+        "/auth/password_change/",
+        {
+            "old_password": "old-password",
+            "new_password1": "Fresh-Passw0rd-42",
+            "new_password2": "Fresh-Passw0rd-42",
+        },
+    )
+    assert response.status_code == 302
+    assert user_client.get("/").wsgi_request.user.is_authenticated
+
+
+def test_profile_edit_keeps_password(user_client, user):
+    password = user.password
+    user_client.get("/")
+    response = user_client.post(
+        "/profile/edit/",
+        {"username": "edited", "first_name": "", "last_name": "", "email": ""},
+    )
+    assert response.status_code == 302
+    user.refresh_from_db()
+    assert (user.username, user.password) == ("edited", password)
@@ -0,0 +1,37 @@
+from copy import deepcopy
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test.utils import override_settings
+
+from blogicum.settings_production import SQLITE_PRAGMAS
+
+pytestmark = [pytest.mark.django_db]
+
+# Так SQLite возвращает значения прагм из боевых настроек.
+EXPECTED = {
+    "journal_mode": "wal",
+    "synchronous": 1,
+    "cache_size": -64000,
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 5000,
+    "temp_store": 2,
+}
+
+
+def test_production_pragmas_applied_on_connect(tmp_path):
+    assert EXPECTED.keys() == SQLITE_PRAGMAS.keys()
+    # WAL недоступен для базы в памяти, поэтому нужен файл.
+    settings_dict = deepcopy(connections[DEFAULT_DB_ALIAS].settings_dict)
+    settings_dict["NAME"] = str(tmp_path / "db.sqlite3")
+    wrapper = DatabaseWrapper(settings_dict, alias="pragmas")
+    try:
+        with override_settings(SQLITE_PRAGMAS=SQLITE_PRAGMAS):
+            wrapper.connect()
+        with wrapper.cursor() as cursor:
+            for name, value in EXPECTED.items():
+                cursor.execute(f"PRAGMA {name}")
+                assert cursor.fetchone()[0] == value, name
+    finally:
+        wrapper.close()
@@ -0,0 +1,218 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import AuthorStats, CategoryStats, LocationStats
+from blog.secondary_func import profile_stats
+from blog.stats import STATS_MODELS
+
+pytestmark = [pytest.mark.django_db]
+
+
+def stats_rows():
+    return {
+        model: {
+            row.pk: (
+                row.posts_published,
+                row.comments_received,
+                row.last_activity,
+            )
+            for row in model.objects.all()
+        }
+        for model in STATS_MODELS
+    }
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category, published_location):
+    def make(is_published=True, **kwargs):
+        return mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            location=published_location,
+            pub_date=timezone.now() - timedelta(days=1),
+            is_published=is_published,
+            **kwargs,
+        )
+
+    return make
+
+
+def test_stats_follow_writes(
+        mixer, make_post, user, published_category, published_location
+):
+    post = make_post()
+    make_post(is_published=False)
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    for model, key in (
+        (AuthorStats, user.pk),
+        (CategoryStats, published_category.pk),
+        (LocationStats, published_location.pk),
+    ):
+        row = model.objects.get(pk=key)
+        assert (row.posts_published, row.comments_received) == (1, 1)
+        assert row.last_activity == comment.created_at
+
+    post.is_published = False
+    post.save()
+    assert AuthorStats.objects.get(pk=user.pk).posts_published == 0
+
+    comment.delete()
+    assert CategoryStats.objects.get(
+        pk=published_category.pk
+    ).comments_received == 0
+
+
+def test_moved_post_takes_comments(
+        mixer, make_post, user, published_category
+):
+    post = make_post()
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    other = mixer.blend("blog.Category", is_published=True)
+    post.category = other
+    post.save()
+    old = CategoryStats.objects.get(pk=published_category.pk)
+    new = CategoryStats.objects.get(pk=other.pk)
+    assert (old.posts_published, old.comments_received) == (0, 0)
+    assert (new.posts_published, new.comments_received) == (1, 2)
+
+
+def test_moved_comment_changes_stats(
+        mixer, make_post, user, published_category
+):
+    post = make_post()
+    other = make_post()
+    other.category = mixer.blend("blog.Category", is_published=True)
+    other.save()
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    comment.post = other
+    comment.save()
+    old = CategoryStats.objects.get(pk=published_category.pk)
+    new = CategoryStats.objects.get(pk=other.category_id)
+    assert (old.comments_received, new.comments_received) == (0, 1)
+    assert AuthorStats.objects.get(pk=user.pk).comments_received == 1
+
+
+def test_incremental_matches_rebuild(mixer, make_post, user):
+    posts = [make_post() for _ in range(3)]
+    mixer.cycle(3).blend("blog.Comment", post=posts[0], author=user)
+    posts[1].delete()
+    posts[2].location = None
+    posts[2].save()
+    incremental = stats_rows()
+    call_command("rebuild_stats", stdout=StringIO())
+    # Пересчёт не хранит пустые строки; время активности после удалений
+    # может отличаться, поэтому сравниваются счётчики.
+    assert {
+        model: {key: values[:2] for key, values in rows.items()}
+        for model, rows in stats_rows().items()
+    } == {
+        model: {
+            key: values[:2]
+            for key, values in rows.items()
+            if values[:2] != (0, 0)
+        }
+        for model, rows in incremental.items()
+    }
+
+
+def test_missing_row_recounted(make_post, user):
+    make_post()
+    AuthorStats.objects.all().delete()
+    make_post()
+    assert AuthorStats.objects.get(pk=user.pk).posts_published == 2
+
+
+def test_deleting_author_drops_stats(make_post, user):
+    make_post()
+    user.delete()
+    assert not AuthorStats.objects.exists()
+
+
+def test_category_page_shows_stats(client, make_post, published_category):
+    make_post()
+    response = client.get(f"/category/{published_category.slug}/")
+    assert "Публикаций: 1, комментариев: 0" in response.content.decode()
+
+
+def test_stats_admin(admin_client, make_post):
+    make_post()
+    for name in ("authorstats", "categorystats", "locationstats"):
+        response = admin_client.get(f"/admin/blog/{name}/")
+        assert response.status_code == 200
+
+
+def test_hidden_category_leaves_stats(
+        mixer, make_post, user, published_category, published_location
+):
+    post = make_post()
+    mixer.blend("blog.Comment", post=post, author=user)
+    published_category.is_published = False
+    published_category.save()
+    assert profile_stats(user)["posts"] == 0
+    for model, key in (
+        (AuthorStats, user.pk),
+        (CategoryStats, published_category.pk),
+        (LocationStats, published_location.pk),
+    ):
+        row = model.objects.get(pk=key)
+        assert (row.posts_published, row.comments_received) == (0, 0)
+
+    # Комментарий к посту вне лент не считается.
+    mixer.blend("blog.Comment", post=post, author=user)
+    published_category.is_published = True
+    published_category.save()
+    row = AuthorStats.objects.get(pk=user.pk)
+    assert (row.posts_published, row.comments_received) == (1, 2)
+
+
+def test_unpublishing_post_takes_comments(mixer, make_post, user):
+    post = make_post()
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    post.is_published = False
+    post.save()
+    mixer.blend("blog.Comment", post=post, author=user)
+    row = AuthorStats.objects.get(pk=user.pk)
+    assert (row.posts_published, row.comments_received) == (0, 0)
+    post.is_published = True
+    post.save()
+    row = AuthorStats.objects.get(pk=user.pk)
+    assert (row.posts_published, row.comments_received) == (1, 3)
+
+
+def test_deleted_category_leaves_author_stats(
+        make_post, user, published_category
+):
+    make_post()
+    published_category.delete()
+    assert AuthorStats.objects.get(pk=user.pk).posts_published == 0
+    assert not CategoryStats.objects.exists()
+
+
+def test_category_page_reads_cached_stats(
+        user_client, make_post, published_category
+):
+    url = f"/category/{published_category.slug}/"
+    make_post()
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get(url)
+    assert not [
+        query for query in queries if "blog_categorystats" in query["sql"]
+    ]
+
+
+def test_cached_category_page_follows_comments(
+        client, mixer, make_post, user, published_category
+):
+    url = f"/category/{published_category.slug}/"
+    post = make_post()
+    client.get(url)
+    mixer.blend("blog.Comment", post=post, author=user)
+    assert "комментариев: 1" in client.get(url).content.decode()
@@ -0,0 +1,67 @@
+import logging
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from blog import metrics
+from blog.middleware import record_query
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+
+
+def test_view_metrics_recorded(user_client, post_with_published_location):
+    response = user_client.get("/")
+    counters = metrics.view_snapshot()
+    assert counters["view_requests_total", "blog:index"] == 1
+    assert counters["view_queries_total", "blog:index"] > 0
+    assert counters["view_render_seconds_total", "blog:index"] > 0
+    assert counters["view_response_bytes_total", "blog:index"] == len(
+        response.content
+    )
+
+
+def test_metrics_endpoint(client, settings):
+    settings.METRICS_TOKEN = "secret"
+    client.get("/")
+    response = client.get("/metrics/", HTTP_AUTHORIZATION="Bearer secret")
+    content = response.content.decode()
+    assert response["Content-Type"].startswith("text/plain")
+    assert 'blogicum_view_requests_total{view="blog:index"} 1' in content
+    assert "# TYPE blogicum_view_queries_total counter" in content
+
+
+def test_metrics_endpoint_access(client, admin_client, settings):
+    # Адрес клиента ничего не решает: за прокси он всегда локальный.
+    assert client.get("/metrics/", REMOTE_ADDR="127.0.0.1").status_code == 404
+    settings.METRICS_TOKEN = "secret"
+    for header in ("", "Bearer wrong", "secret"):
+        response = client.get("/metrics/", HTTP_AUTHORIZATION=header)
+        assert response.status_code == 404
+    assert admin_client.get("/metrics/").status_code == 200
+
+
+def test_query_budget_warning(
+        client, settings, caplog, post_with_published_location
+):
+    settings.QUERY_BUDGET = 0
+    with caplog.at_level(logging.WARNING, logger="blog.middleware"):
+        client.get("/")
+    assert "blog:index" in caplog.text
+    counters = metrics.view_snapshot()
+    assert counters["view_query_budget_exceeded_total", "blog:index"] == 1
+
+
+def test_reconnect_keeps_single_recorder():
+    wrapper = connections.create_connection(DEFAULT_DB_ALIAS)
+    try:
+        for _ in range(3):
+            wrapper.connect()
+            wrapper.close()
+        assert wrapper.execute_wrappers.count(record_query) == 1
+    finally:
+        wrapper.close()